@@ -0,0 +1,77 @@
+"""In-process caches for the agent graph.
+
+Exact-match, TTL-bounded LRU caches used to skip repeated work across
+turns: deterministic LLM classifications and read-only tool results.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class ExactMatchCache(Generic[T]):
+    """Thread-safe LRU cache with per-entry time-to-live.
+
+    Callers may run in worker threads (sync nodes, asyncio.to_thread), so
+    all access is guarded by a lock. Keys are arbitrary strings; use
+    :meth:`make_key` to hash large inputs such as full prompts.
+    """
+
+    def __init__(self, ttl: float = 3600.0, maxsize: int = 2048) -> None:
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, T]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Hash the given parts into a fixed-size key."""
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> T | None:
+        """Return a fresh cached value, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: T) -> None:
+        """Store a value, evicting the least recently used beyond maxsize."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: str, compute: Callable[[], T]) -> T:
+        """Return the cached value for key, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def pop(self, key: str) -> None:
+        """Drop a single entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
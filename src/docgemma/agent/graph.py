@@ -36,6 +36,7 @@ from .nodes import (
     tool_select,
 )
 from .prompts import TOOL_CLINICAL_LABELS, WRITE_TOOLS
+from .schemas import OUTLINES_SCHEMAS
 from .state import AgentState
 from ..tools.registry import execute_tool as registry_execute_tool
 
@@ -273,7 +274,9 @@ def _make_initial_state(
         # Tool Loop
         "current_tool": None,
         "current_args": None,
-        "tool_results": [],
+        "tool_results": None,  # None resets the accumulating channels
+        "completed_tools": None,
+        "tool_call_keys": None,
         "step_count": 0,
         # Result Classification
         "last_result_classification": None,
@@ -388,7 +391,7 @@ def _summarize_result(result: dict) -> str:
         if not interactions:
             return "No interactions found"
         ix = interactions[0]
-        desc = ix.get("description", str(ix)) if isinstance(ix, dict) else str(ix)
+        desc = ix["description"] if isinstance(ix, dict) and "description" in ix else str(ix)
         return f"{len(interactions)} interaction(s): {desc[:100]}..."
 
     if tool == "search_medical_literature":
@@ -396,7 +399,7 @@ def _summarize_result(result: dict) -> str:
         if not articles:
             return "No articles found"
         first = articles[0]
-        title = first.get("title", str(first)) if isinstance(first, dict) else str(first)
+        title = first["title"] if isinstance(first, dict) and "title" in first else str(first)
         return f"{len(articles)} article(s) — {title[:100]}"
 
     if tool == "find_clinical_trials":
@@ -404,7 +407,11 @@ def _summarize_result(result: dict) -> str:
         if not trials:
             return "No trials found"
         first = trials[0]
-        title = first.get("title", first.get("brief_title", str(first))) if isinstance(first, dict) else str(first)
+        title = next(
+            (first[k] for k in ("title", "brief_title") if k in first), None
+        ) if isinstance(first, dict) else None
+        if title is None:
+            title = str(first)
         return f"{len(trials)} trial(s) — {title[:100]}"
 
     if tool == "search_patient":
@@ -465,7 +472,11 @@ def _format_result_detail(result: dict) -> str | None:
         lines = [f"**Interactions ({len(interactions)}):**"]
         for ix in interactions:
             if isinstance(ix, dict):
-                desc = ix.get("description", ix.get("name", str(ix)))
+                desc = next(
+                    (ix[k] for k in ("description", "name") if k in ix), None
+                )
+                if desc is None:
+                    desc = str(ix)
                 severity = ix.get("severity", "")
                 sev_tag = f" *({severity})*" if severity else ""
                 lines.append(f"- {desc}{sev_tag}")
@@ -706,6 +717,9 @@ def build_graph(
     """
     _executor = tool_executor if tool_executor is not None else registry_execute_tool
 
+    # Build every guided-decoding schema payload up front
+    model.warm_schemas(OUTLINES_SCHEMAS)
+
     workflow = StateGraph(AgentState)
 
     # === Add Nodes ===
@@ -719,13 +733,17 @@ def build_graph(
 
     workflow.add_node("preliminary_thinking", _preliminary_thinking)
 
-    # 2. Intent classify (LLM + Outlines)
-    workflow.add_node(
-        "intent_classify", lambda s: intent_classify(s, model)
-    )
+    # 2. Intent classify (LLM + Outlines, async)
+    async def _intent_classify(s):
+        return await intent_classify(s, model)
+
+    workflow.add_node("intent_classify", _intent_classify)
+
+    # 3. Tool select (LLM + Outlines, two-stage, async)
+    async def _tool_select(s):
+        return await tool_select(s, model)
 
-    # 3. Tool select (LLM + Outlines, two-stage)
-    workflow.add_node("tool_select", lambda s: tool_select(s, model))
+    workflow.add_node("tool_select", _tool_select)
 
     # 4. Tool execute (async, deterministic)
     async def _tool_execute(s):
@@ -733,10 +751,11 @@ def build_graph(
 
     workflow.add_node("tool_execute", _tool_execute)
 
-    # 5. Result classify (LLM + Outlines)
-    workflow.add_node(
-        "result_classify", lambda s: result_classify(s, model)
-    )
+    # 5. Result classify (LLM + Outlines, async)
+    async def _result_classify(s):
+        return await result_classify(s, model)
+
+    workflow.add_node("result_classify", _result_classify)
 
     # 6. Synthesize (LLM streaming, terminal)
     async def _synthesize(s):
@@ -749,13 +768,15 @@ def build_graph(
 
     # === Edges ===
 
-    # input_assembly → conditional: thinking or intent_classify
+    # input_assembly → conditional: thinking, intent_classify, or synthesize
+    # (tools disabled)
     workflow.add_conditional_edges(
         "input_assembly",
         route_after_input_assembly,
         {
             "preliminary_thinking": "preliminary_thinking",
             "intent_classify": "intent_classify",
+            "synthesize": "synthesize",
         },
     )
 
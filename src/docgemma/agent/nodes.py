@@ -14,16 +14,23 @@ Nodes:
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
 import logging
 import re
+import string
 import time
-from collections.abc import Awaitable
+from collections.abc import AsyncIterator, Awaitable, Mapping
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Any, Callable
 
+from ..tools.fhir_store.store import on_patient_write
+from .cache import ExactMatchCache
 from .prompts import (
     ACTION_VERBS,
     COMMON_DRUGS,
+    DEFAULT_TOOL_EXAMPLE,
     DIRECT_CHAT_PROMPT,
     ERROR_TEMPLATES,
     INTENT_CLASSIFY_PROMPT,
@@ -41,7 +48,9 @@ from .prompts import (
     TOOL_EXAMPLES,
     TOOL_SELECT_STAGE1_PROMPT,
     TOOL_SELECT_STAGE2_PROMPT,
+    TOOL_SUMMARY,
     WRITE_TOOLS,
+    get_time_context,
 )
 from .schemas import (
     IntentClassification,
@@ -64,13 +73,67 @@ StreamCallback = Callable[[str], Awaitable[None]] | None
 # Constants
 # =============================================================================
 
-# Regex: UUID patient IDs (xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx)
-_UUID_RE = re.compile(
-    r"\b[a-f0-9]{8}(?:-[a-f0-9]{4}){3}-[a-f0-9]{12}\b", re.IGNORECASE
+# Regex fragment: patient IDs — UUIDs (xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx,
+# any case) or short IDs (abc-123, lowercase only)
+_PATIENT_ID_PATTERN = (
+    r"\b(?:(?i:[a-f0-9]{8}(?:-[a-f0-9]{4}){3}-[a-f0-9]{12})|[a-z]{3}-\d{3})\b"
 )
 
-# Regex: Short patient IDs (abc-123)
-_SHORT_ID_RE = re.compile(r"\b[a-z]{3}-\d{3}\b")
+# Regex fragment: drug dictionary as one word-bounded alternation (longest
+# first, so a name is never shadowed by a shorter entry sharing its prefix)
+_DRUG_PATTERN = (
+    r"(?i:\b(?:"
+    + "|".join(map(re.escape, sorted(COMMON_DRUGS, key=lambda d: (-len(d), d))))
+    + r")\b)"
+)
+
+# Regex fragment: action verbs — single words need word boundaries,
+# multi-word phrases match as plain substrings. Longest-first so the engine
+# never backtracks out of a shorter prefix match.
+_SINGLE_VERBS = sorted(
+    (v for v in ACTION_VERBS if " " not in v), key=lambda v: (-len(v), v)
+)
+_PHRASE_VERBS = sorted(
+    (v for v in ACTION_VERBS if " " in v), key=lambda v: (-len(v), v)
+)
+_VERB_PATTERN = (
+    r"(?i:\b(?:" + "|".join(map(re.escape, _SINGLE_VERBS)) + r")\b|"
+    + "|".join(map(re.escape, _PHRASE_VERBS)) + ")"
+)
+
+# Regex: all entity kinds in one scan, dispatched by named group
+_ENTITY_RE = re.compile(
+    f"(?P<patient_id>{_PATIENT_ID_PATTERN})"
+    f"|(?P<drug>{_DRUG_PATTERN})"
+    f"|(?P<verb>{_VERB_PATTERN})"
+)
+
+# Regex: error categories for ERROR_TEMPLATES, in precedence order. Each
+# branch is a lookahead over the whole string, so the first *category* that
+# matches anywhere wins (not the earliest keyword position).
+_ERROR_KEYWORDS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("timeout", ("timeout", "timed out")),
+    ("not_found", ("not found", "no results", "no match")),
+    ("invalid_args", ("argument", "missing", "required", "invalid")),
+    ("rate_limit", ("rate limit", "too many requests")),
+    ("server_error", ("server error", "500", "internal")),
+    ("multiple_matches", ("multiple",)),
+)
+_ERROR_CATEGORY_RE = re.compile(
+    "|".join(
+        rf"(?=.*?(?:{'|'.join(map(re.escape, kws))}))(?P<{name}>)"
+        for name, kws in _ERROR_KEYWORDS
+    ),
+    re.IGNORECASE | re.DOTALL,
+)
+
+# ERROR_TEMPLATES rendered for every known tool label with no entity —
+# the common case on error paths; see _error_message
+_PRECOMPUTED_ERRORS: dict[tuple[str, str], str] = {
+    (error_type, label): template.format(tool_label=label, entity="")
+    for error_type, template in ERROR_TEMPLATES.items()
+    for label in TOOL_CLINICAL_LABELS.values()
+}
 
 # Per-tool description snippets for TOOL_SELECT Stage 2 prompts
 _TOOL_STAGE2_DESC: dict[str, str] = {
@@ -103,12 +166,175 @@ _TOOL_STAGE2_DESC: dict[str, str] = {
     ),
 }
 
+# Deterministic intent rules: (imperative regex, min drugs, needs explicit
+# patient ID, tool). A rule fires only for a command that opens with its verb
+# and names the entities in the query itself (the session patient injected
+# by input_assembly does not count); intent_classify then skips the LLM call.
+_INTENT_FASTPATH: tuple[tuple[re.Pattern, int, bool, str], ...] = (
+    (
+        re.compile(r"\s*(?:please\s+)?prescribe\b", re.IGNORECASE),
+        1,
+        True,
+        "prescribe_medication",
+    ),
+    (
+        re.compile(r"\s*(?:please\s+)?check\b.*\binteract", re.IGNORECASE | re.DOTALL),
+        2,
+        False,
+        "check_drug_interactions",
+    ),
+)
+
+# Negated requests ("don't check interactions, just explain X") and
+# questions ("What dose should I prescribe?") never take the fast path;
+# the LLM classifier decides those
+_NEGATION_RE = re.compile(
+    r"\b(?:not|no|never|without|skip|instead|(?:do|does|did)n['’]?t)\b"
+)
+_QUESTION_RE = re.compile(
+    r"\?"
+    r"|^\s*(?:what|which|who|whom|whose|when|where|why|how|is|are|was|were"
+    r"|do|does|did|can|could|should|would|will|shall|may|might)\b"
+    r"|\b(?:should|can|could|would|may|might|shall)\s+(?:i|we)\b",
+    re.IGNORECASE,
+)
+
+
+def _compile_keywords(keywords: list[str]) -> re.Pattern:
+    """Compile keywords into one substring alternation.
+
+    Case-sensitive and matched against the lowercased query, exactly like
+    a ``kw in query_lower`` check (so mixed-case keywords never match).
+    """
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+# TASK_PATTERNS with keyword rules precompiled:
+# (pattern, "keywords" regex, one regex per "keywords_all" group)
+_TaskPatternMatcher = tuple[dict, re.Pattern | None, list[re.Pattern] | None]
+_TASK_PATTERN_MATCHERS: list[_TaskPatternMatcher] = [
+    (
+        pattern,
+        _compile_keywords(pattern["keywords"]) if "keywords" in pattern else None,
+        [_compile_keywords(g.split("|")) for g in pattern["keywords_all"]]
+        if "keywords_all" in pattern
+        else None,
+    )
+    for pattern in TASK_PATTERNS.values()
+]
+
+# Tools whose results can require user clarification (see
+# _needs_user_clarification); other results skip the check entirely
+_CLARIFYING_TOOLS: frozenset[str] = frozenset({"search_patient"})
+
+# Read-only tool results, reused when the same call repeats (within or across
+# turns).  Keyed by tool name + canonical args; write tools are never cached.
+_TOOL_CACHE: ExactMatchCache[ToolResult] = ExactMatchCache(ttl=600.0, maxsize=128)
+
+# Deterministic (T=0) classification results, keyed by node + prompt + history
+_CLASSIFY_CACHE: ExactMatchCache[Any] = ExactMatchCache(ttl=3600.0, maxsize=2048)
+
+# Session patient charts pre-fetched by input_assembly, keyed by patient_id.
+# Every write through the FHIR store calls invalidate_chart_cache (registered
+# via on_patient_write below), so the TTL only bounds out-of-band edits.
+_CHART_CACHE: ExactMatchCache[str] = ExactMatchCache(ttl=30.0, maxsize=64)
+
+# Shared JSON encoders — json.dumps(..., default=str) builds a new encoder on
+# every call; these are built once and reused for all prompt/log payloads.
+_JSON_ENCODER = json.JSONEncoder(default=str)
+_CANONICAL_JSON_ENCODER = json.JSONEncoder(default=str, sort_keys=True)
+
+
+def _compile_template(template: str) -> Callable[..., str]:
+    """Pre-parse a ``str.format`` template into a join-based renderer.
+
+    Only plain ``{name}`` fields are supported (no conversions or format
+    specs); the returned callable takes the same keyword arguments.
+    """
+    parts: list[tuple[str, str | None]] = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if spec or conversion:
+            raise ValueError(f"Unsupported template field: {{{field}!{conversion}:{spec}}}")
+        parts.append((literal, field))
+
+    def render(**values: Any) -> str:
+        out: list[str] = []
+        for literal, field in parts:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return "".join(out)
+
+    return render
+
+
+# Node prompt templates, pre-parsed once at import
+_render_preliminary_thinking = _compile_template(PRELIMINARY_THINKING_PROMPT)
+_render_intent_classify = _compile_template(INTENT_CLASSIFY_PROMPT)
+_render_tool_select_stage1 = _compile_template(TOOL_SELECT_STAGE1_PROMPT)
+_render_tool_arg_thinking = _compile_template(TOOL_ARG_THINKING_PROMPT)
+_render_tool_select_stage2 = _compile_template(TOOL_SELECT_STAGE2_PROMPT)
+_render_result_classify = _compile_template(RESULT_CLASSIFY_PROMPT)
+_render_direct_chat = _compile_template(DIRECT_CHAT_PROMPT)
+_render_synthesize_user = _compile_template(SYNTHESIZE_USER_TEMPLATE)
+_render_error = {
+    error_type: _compile_template(template)
+    for error_type, template in ERROR_TEMPLATES.items()
+}
+
+# Synthesis guidelines, prepended to every tool-route synthesis prompt
+_SYNTH_SYS_PREFIX = SYNTHESIZE_SYSTEM_PROMPT + "\n\n"
+
+# Intent fields when the user disabled tool calling (no classification needed)
+_TOOLS_DISABLED_INTENT: dict[str, Any] = {
+    "intent": "DIRECT",
+    "task_summary": "Direct response (tools disabled)",
+    "suggested_tool": None,
+}
+
+# Appended to the DIRECT route context when the user disabled tool calling
+_TOOLS_DISABLED_NOTE = (
+    "\nNote: Tool calling is disabled. Answer using only the information above.\n"
+)
+
+# Character budgets for tool results in the synthesis prompt: per result,
+# and shared across all results of a turn
+_SYNTH_RESULT_CHARS = 1000
+_SYNTH_RESULTS_TOTAL_CHARS = 3000
+
+# Overall synthesis prompt budget (chars, history included). Tool results
+# get what the fixed sections leave, never less than one result's worth.
+_SYNTH_PROMPT_CHARS = 16000
+
+# Combined formatted tool-payload size above which synthesis prompt assembly
+# moves off the event loop; smaller payloads are not worth a thread hop
+_SYNTH_OFFLOAD_CHARS = 24000
+
+# Conversation history passed to the model on every call
+_MAX_HISTORY_TURNS = 8
+_MAX_HISTORY_CHARS = 4000
+
+# Shared read-only defaults for state.get() on missing channels, so a miss
+# does not allocate a fresh [] / {} (never store these back into state)
+_NO_ITEMS: tuple = ()
+_NO_ENTITIES: Mapping[str, Any] = MappingProxyType({})
+
+# Streaming: coalesce decoded chunks before forwarding them to the callback
+_STREAM_FLUSH_CHARS = 32
+_STREAM_FLUSH_MAX_CHUNKS = 8
+_STREAM_FLUSH_INTERVAL_S = 0.02
+
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
 
+def _dumps(obj: Any) -> str:
+    """Serialize to JSON, stringifying unsupported types."""
+    return _JSON_ENCODER.encode(obj)
+
+
 def _truncate(text: str, max_len: int = 200) -> str:
     """Truncate text for logging."""
     if len(text) > max_len:
@@ -116,39 +342,67 @@ def _truncate(text: str, max_len: int = 200) -> str:
     return text
 
 
-def _extract_patient_ids(text: str) -> list[str]:
-    """Extract patient IDs from text using regex patterns."""
-    ids: list[str] = []
-    ids.extend(_UUID_RE.findall(text))
-    ids.extend(_SHORT_ID_RE.findall(text))
-    return ids
-
-
-def _extract_drug_mentions(text: str) -> list[str]:
-    """Extract drug names by word-boundary dictionary matching."""
-    text_lower = text.lower()
-    found = []
-    for drug in COMMON_DRUGS:
-        pattern = r"\b" + re.escape(drug) + r"\b"
-        if re.search(pattern, text_lower):
-            found.append(drug)
-    return found
-
-
-def _extract_action_verbs(text: str) -> list[str]:
-    """Extract action verbs from text."""
-    text_lower = text.lower()
-    found = []
-    for verb in ACTION_VERBS:
-        if " " in verb:
-            # Multi-word phrases: substring match
-            if verb in text_lower:
-                found.append(verb)
+@functools.lru_cache(maxsize=256)
+def _extract_entities(
+    text: str,
+) -> tuple[tuple[str, ...], tuple[str, ...], tuple[str, ...]]:
+    """Extract patient IDs, drug mentions, and action verbs in one regex scan.
+
+    Drugs and verbs are lowercased and deduplicated in first-mention order.
+    Memoized per query text (resent/edited queries), so results are tuples.
+    """
+    patient_ids: list[str] = []
+    drugs: dict[str, None] = {}
+    verbs: dict[str, None] = {}
+    for m in _ENTITY_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "patient_id":
+            patient_ids.append(m.group())
+        elif kind == "drug":
+            drugs[m.group().lower()] = None
         else:
-            pattern = r"\b" + re.escape(verb) + r"\b"
-            if re.search(pattern, text_lower):
-                found.append(verb)
-    return found
+            verbs[m.group().lower()] = None
+    return tuple(patient_ids), tuple(drugs), tuple(verbs)
+
+
+def _fastpath_tool(query: str) -> str | None:
+    """Tool for an unambiguous imperative tool request, else None.
+
+    Entities are re-extracted from the query alone, so a selected session
+    patient never stands in for an explicitly named one.
+    """
+    if _NEGATION_RE.search(query) or _QUESTION_RE.search(query):
+        return None
+    patient_ids, drugs, _ = _extract_entities(query)
+    for imperative_re, min_drugs, needs_patient, tool in _INTENT_FASTPATH:
+        if (
+            imperative_re.match(query)
+            and len(drugs) >= min_drugs
+            and (patient_ids or not needs_patient)
+        ):
+            return tool
+    return None
+
+
+def _bounded_history(history: list[dict]) -> list[dict]:
+    """Trim conversation history to the newest messages within the caps.
+
+    Keeps at most _MAX_HISTORY_TURNS messages totalling _MAX_HISTORY_CHARS
+    of text, and never starts on an assistant message (the chat template
+    requires user/assistant alternation starting with user).
+    """
+    recent = history[-_MAX_HISTORY_TURNS:]
+    total = 0
+    start = len(recent)
+    for i in range(len(recent) - 1, -1, -1):
+        content = recent[i].get("content")
+        total += len(content) if isinstance(content, str) else 0
+        if total > _MAX_HISTORY_CHARS:
+            break
+        start = i
+    while start < len(recent) and recent[start].get("role") != "user":
+        start += 1
+    return recent[start:]
 
 
 def _collect_args_for_registry(
@@ -168,19 +422,140 @@ def _collect_args_for_registry(
     return args
 
 
-def _format_tool_result(result: ToolResult) -> str:
+def _truncate_tree(
+    obj: Any, max_str: int = 800, max_list: int = 20, max_depth: int = 6
+) -> Any:
+    """Return a bounded copy of a JSON-like tree for prompt injection.
+
+    Strings are cut at max_str chars, lists at max_list items, and nesting
+    below max_depth is collapsed to a placeholder. Dict entries with None
+    values are dropped.
+    """
+    if isinstance(obj, str):
+        return obj[:max_str] + "..." if len(obj) > max_str else obj
+    if not isinstance(obj, (dict, list, tuple)):
+        return obj
+    if max_depth <= 0:
+        return "..."
+    if isinstance(obj, dict):
+        return {
+            k: _truncate_tree(v, max_str, max_list, max_depth - 1)
+            for k, v in obj.items()
+            if v is not None
+        }
+    items = [_truncate_tree(v, max_str, max_list, max_depth - 1) for v in obj[:max_list]]
+    if len(obj) > max_list:
+        items.append(f"... {len(obj) - max_list} more")
+    return items
+
+
+def _format_tool_result(result: ToolResult, budget: int = _SYNTH_RESULT_CHARS) -> str:
     """Format a single tool result with clinical label for synthesis."""
     label = result.get("tool_label", result.get("tool_name", "Unknown"))
     if result.get("success"):
-        data = result.get("result", {})
-        data_str = json.dumps(data, default=str)
-        if len(data_str) > 1000:
-            data_str = data_str[:1000] + "..."
+        # Bound the tree first so large payloads are never fully serialized;
+        # no single string can outlive the final cut, so cap strings there.
+        data = _truncate_tree(result.get("result", {}), max_str=budget, max_list=10)
+        data_str = _dumps(data)
+        if len(data_str) > budget:
+            data_str = data_str[:budget] + "..."
         return f"{label}:\n{data_str}"
     error = result.get("error", "Unknown error")
     return f"{label}: {error}"
 
 
+def _format_tool_results(
+    results: list[ToolResult], budget: int = _SYNTH_RESULTS_TOTAL_CHARS
+) -> str:
+    """Format successful results for synthesis within a shared char budget.
+
+    The budget is split evenly across results; whatever a short result
+    leaves unused is handed to the longer ones, so a single large payload
+    cannot crowd out the rest.
+    """
+    sections = [_format_tool_result(r) for r in results]
+    if sum(map(len, sections)) <= budget:
+        return "\n\n".join(sections)
+
+    # Water-fill: settle results that fit their fair share, smallest first
+    order = sorted(range(len(sections)), key=lambda i: len(sections[i]))
+    remaining = budget
+    for n, i in enumerate(order):
+        share = remaining // (len(order) - n)
+        if len(sections[i]) > share:
+            sections[i] = _format_tool_result(results[i], budget=max(share, 1))
+        remaining -= len(sections[i])
+    return "\n\n".join(sections)
+
+
+def _tool_call_key(tool_name: str, args: dict[str, Any]) -> str:
+    """Canonical fingerprint of a tool call (order-independent args)."""
+    return f"{tool_name}:{_CANONICAL_JSON_ENCODER.encode(args)}"
+
+
+async def _stream_batched(
+    stream: AsyncIterator[str], stream_callback: StreamCallback
+) -> str:
+    """Consume a token stream and return the full text.
+
+    Chunks are pushed onto an asyncio.Queue as they are decoded; a separate
+    drain task forwards them to stream_callback in batches of
+    _STREAM_FLUSH_CHARS chars, _STREAM_FLUSH_MAX_CHUNKS chunks, or every
+    _STREAM_FLUSH_INTERVAL_S (whichever comes first), so a slow callback
+    (websocket/SSE send) never stalls the decoder.
+    """
+    chunks: list[str] = []
+    if stream_callback is None:
+        async for chunk in stream:
+            chunks.append(chunk)
+        return "".join(chunks)
+
+    queue: asyncio.Queue[str | None] = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    async def _drain() -> None:
+        buffer: list[str] = []
+        size = 0
+        deadline: float | None = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                chunk = await asyncio.wait_for(queue.get(), timeout)
+            except TimeoutError:
+                chunk = ""
+            if chunk is None:
+                break
+            if chunk:
+                if not buffer:
+                    deadline = loop.time() + _STREAM_FLUSH_INTERVAL_S
+                buffer.append(chunk)
+                size += len(chunk)
+            if buffer and (
+                size >= _STREAM_FLUSH_CHARS
+                or len(buffer) >= _STREAM_FLUSH_MAX_CHUNKS
+                or loop.time() >= deadline
+            ):
+                await stream_callback("".join(buffer))
+                buffer.clear()
+                size = 0
+                deadline = None
+        if buffer:
+            await stream_callback("".join(buffer))
+
+    drain_task = asyncio.create_task(_drain())
+    try:
+        async for chunk in stream:
+            if drain_task.done():
+                drain_task.result()  # Surface callback errors early
+            queue.put_nowait(chunk)
+            chunks.append(chunk)
+    finally:
+        queue.put_nowait(None)
+        await drain_task
+
+    return "".join(chunks)
+
+
 def _patient_context_section(state: dict) -> str:
     """Build patient context section for prompt injection.
 
@@ -190,7 +565,12 @@ def _patient_context_section(state: dict) -> str:
     ctx = state.get("patient_context")
     if not ctx:
         return ""
-    pid = state.get("session_patient_id", "")
+    return _render_patient_context(ctx, state.get("session_patient_id", ""))
+
+
+@functools.lru_cache(maxsize=32)
+def _render_patient_context(ctx: str, pid: str | None) -> str:
+    """Render the patient context block (memoized — same chart every node)."""
     header = f"\nActive patient record (ID: {pid}):\n" if pid else "\nActive patient record:\n"
     return f"{header}{ctx}\n"
 
@@ -204,6 +584,12 @@ def _thinking_context_section(state: dict) -> str:
     text = state.get("preliminary_thinking_text")
     if not text:
         return ""
+    return _render_thinking_context(text)
+
+
+@functools.lru_cache(maxsize=32)
+def _render_thinking_context(text: str) -> str:
+    """Render the preliminary reasoning block (memoized per turn)."""
     return f"\nPreliminary reasoning:\n{text}\n"
 
 
@@ -216,15 +602,22 @@ def _image_findings_section(state: dict) -> str:
     exists so the prompt template collapses cleanly.
     """
     current = state.get("image_findings")
-    previous = state.get("previous_image_findings")
-
     if current:
-        return f"\nImage findings:\n{current}\n"
+        return _render_image_findings(current, False)
+    previous = state.get("previous_image_findings")
     if previous:
-        return f"\nImage findings (from prior message):\n{previous}\n"
+        return _render_image_findings(previous, True)
     return ""
 
 
+@functools.lru_cache(maxsize=32)
+def _render_image_findings(findings: str, from_prior: bool) -> str:
+    """Render the image findings block (memoized — reused by every node)."""
+    if from_prior:
+        return f"\nImage findings (from prior message):\n{findings}\n"
+    return f"\nImage findings:\n{findings}\n"
+
+
 def _format_error_for_synthesis(error_messages: list[str]) -> str:
     """Format error messages for synthesis prompt (pre-formatted, clinician-safe)."""
     if not error_messages:
@@ -232,70 +625,78 @@ def _format_error_for_synthesis(error_messages: list[str]) -> str:
     return "\n".join(f"- {msg}" for msg in error_messages)
 
 
+def _error_message(error_type: str, tool_label: str, entity: str = "") -> str:
+    """Render the clinician-safe ERROR_TEMPLATES message for an error category."""
+    if not entity:
+        cached = _PRECOMPUTED_ERRORS.get((error_type, tool_label))
+        if cached is not None:
+            return cached
+    render = _render_error.get(error_type, _render_error["generic"])
+    return render(tool_label=tool_label, entity=entity)
+
+
 def _classify_error(error_str: str) -> str:
     """Classify an error string into a category for ERROR_TEMPLATES."""
-    error_lower = error_str.lower()
-    if any(kw in error_lower for kw in ("timeout", "timed out")):
-        return "timeout"
-    if any(kw in error_lower for kw in ("not found", "no results", "no match")):
-        return "not_found"
-    if any(kw in error_lower for kw in ("argument", "missing", "required", "invalid")):
-        return "invalid_args"
-    if any(kw in error_lower for kw in ("rate limit", "too many requests")):
-        return "rate_limit"
-    if any(kw in error_lower for kw in ("server error", "500", "internal")):
-        return "server_error"
-    if "multiple" in error_lower:
-        return "multiple_matches"
-    return "generic"
-
-
-def _is_duplicate_tool_call(
-    tool_name: str, args: dict, tool_results: list[ToolResult]
-) -> bool:
+    m = _ERROR_CATEGORY_RE.match(error_str)
+    return m.lastgroup if m else "generic"
+
+
+def _is_duplicate_tool_call(call_key: str, seen_keys: frozenset[str]) -> bool:
     """Detect if this exact tool call was already executed (stuck loop prevention)."""
-    for prev in tool_results:
-        if prev.get("tool_name") == tool_name and prev.get("args") == args:
-            return True
-    return False
+    return call_key in seen_keys
 
 
-def _match_task_pattern(query: str, pattern: dict) -> bool:
-    """Check if a query matches a task pattern's keyword rules."""
-    query_lower = query.lower()
+def _match_task_pattern(query: str, matcher: _TaskPatternMatcher) -> bool:
+    """Check if a lowercased query matches a task pattern's keyword rules."""
+    _, keywords_re, keywords_all_res = matcher
 
     # "keywords" — any keyword matches
-    if "keywords" in pattern:
-        if any(kw in query_lower for kw in pattern["keywords"]):
-            return True
+    if keywords_re is not None and keywords_re.search(query):
+        return True
 
     # "keywords_all" — every group must match (pipe-separated alternatives)
-    if "keywords_all" in pattern:
-        for group in pattern["keywords_all"]:
-            alternatives = group.split("|")
-            if not any(alt in query_lower for alt in alternatives):
-                return False
-        return True
+    if keywords_all_res is not None:
+        return all(r.search(query) for r in keywords_all_res)
 
     return False
 
 
+@functools.lru_cache(maxsize=256)
+def _matching_task_patterns(query: str) -> tuple[dict, ...]:
+    """Return every TASK_PATTERNS entry the query matches.
+
+    Memoized per query: the query is fixed for a turn while result_classify
+    and the router re-check it on every tool loop iteration.
+    """
+    query_lower = query.lower()
+    return tuple(
+        m[0] for m in _TASK_PATTERN_MATCHERS if _match_task_pattern(query_lower, m)
+    )
+
+
 def _task_pattern_satisfied(
-    query: str, tool_results: list[ToolResult]
+    patterns: tuple[dict, ...], completed_tools: frozenset[str]
 ) -> bool:
-    """Check if all required tools for the matched task pattern have been executed.
+    """Check if all required tools for any matched task pattern have been executed.
 
     Deterministic termination logic (V3 spec Section 11).
     """
-    completed_tools = {r["tool_name"] for r in tool_results if r.get("success")}
+    return any(p["requires"].issubset(completed_tools) for p in patterns)
 
-    for pattern in TASK_PATTERNS.values():
-        if _match_task_pattern(query, pattern):
-            required = pattern["requires"]
-            if required.issubset(completed_tools):
-                return True
 
-    return False
+def _stage1_agreed(
+    query: str, suggested: str | None, completed_tools: frozenset[str] | None
+) -> bool:
+    """Whether Stage 1 tool selection can be skipped for the suggested tool.
+
+    Only on the first tool-loop step, for read-only tools, and only when
+    the query matches exactly one task pattern and it requires just the
+    tool intent_classify suggested.
+    """
+    if completed_tools or suggested not in TOOL_ARG_SCHEMAS or suggested in WRITE_TOOLS:
+        return False
+    patterns = _matching_task_patterns(query)
+    return len(patterns) == 1 and patterns[0]["requires"] == {suggested}
 
 
 def _needs_user_clarification(tool_results: list[ToolResult]) -> str | None:
@@ -325,6 +726,63 @@ def _needs_user_clarification(tool_results: list[ToolResult]) -> str | None:
     return None
 
 
+# Deterministic result quality for tools whose successful payload is
+# canonical. Each returns (quality, summary), or None to defer to the LLM.
+_QualityCheck = Callable[[dict], "tuple[str, str] | None"]
+
+
+def _quality_confirmation(result: dict) -> tuple[str, str] | None:
+    """Chart reads and write confirmations: a non-empty result text."""
+    text = result.get("result")
+    if isinstance(text, str) and text.strip():
+        return "success_rich", _truncate(text)
+    return None
+
+
+def _quality_drug_safety(result: dict) -> tuple[str, str] | None:
+    """FDA label lookup: a label was found, or none exists for the name.
+
+    "No boxed warning" is only reported when a label was actually found;
+    an unknown or misspelled name is no_results, never a safety verdict.
+    """
+    drug = result.get("brand_name")
+    if not drug:
+        return None
+    if not result.get("label_found"):
+        return "no_results", f"No FDA label found for {drug}"
+    if result.get("has_warning"):
+        return "success_rich", f"Boxed warning found for {drug}"
+    return "success_rich", f"No boxed warning on the FDA label for {drug}"
+
+
+def _quality_drug_interactions(result: dict) -> tuple[str, str] | None:
+    """RxNav check: every drug resolved to an RxCUI."""
+    rxcuis = result.get("resolved_rxcuis") or {}
+    if not rxcuis or None in rxcuis.values():
+        return None
+    count = len(result.get("interactions") or ())
+    return "success_rich", f"{count} interaction(s) found among {', '.join(rxcuis)}"
+
+
+def _quality_search(result: dict) -> tuple[str, str] | None:
+    """Literature/trials search: only an empty hit list is unambiguous."""
+    if result.get("total_found") == 0:
+        return "no_results", "The search returned no results"
+    return None
+
+
+_DETERMINISTIC_QUALITY: dict[str, _QualityCheck] = {
+    "get_patient_chart": _quality_confirmation,
+    "add_allergy": _quality_confirmation,
+    "prescribe_medication": _quality_confirmation,
+    "save_clinical_note": _quality_confirmation,
+    "check_drug_safety": _quality_drug_safety,
+    "check_drug_interactions": _quality_drug_interactions,
+    "search_medical_literature": _quality_search,
+    "find_clinical_trials": _quality_search,
+}
+
+
 # =============================================================================
 # Preliminary Thinking (optional pre-reasoning step, gated by thinking_enabled)
 # =============================================================================
@@ -343,47 +801,51 @@ async def preliminary_thinking(
     """
     query = state.get("user_query", "")
     context = _patient_context_section(state)
-    history = state.get("conversation_history", [])
+    history = state.get("conversation_history", _NO_ITEMS)
 
     image_section = _image_findings_section(state)
 
     tool_calling_enabled = state.get("tool_calling_enabled", True)
-    tools_section = f"\nAvailable tools:\n{TOOL_DESCRIPTIONS}\n" if tool_calling_enabled else ""
+    tools_section = f"\n{TOOL_SUMMARY}" if tool_calling_enabled else ""
 
-    prompt = PRELIMINARY_THINKING_PROMPT.format(
+    prompt = _render_preliminary_thinking(
         user_query=query,
         patient_context_section=context,
         image_section=image_section,
         tools_section=tools_section,
     )
 
-    chunks: list[str] = []
-    async for chunk in model.generate_stream(
-        prompt,
-        max_new_tokens=MAX_TOKENS["preliminary_thinking"],
-        do_sample=True,
-        temperature=TEMPERATURE["preliminary_thinking"],
-        messages=history,
-        filter_thinking=False,
-    ):
-        if stream_callback:
-            await stream_callback(chunk)
-        chunks.append(chunk)
-
-    response = "".join(chunks)
+    response = await _stream_batched(
+        model.generate_stream(
+            prompt,
+            max_new_tokens=MAX_TOKENS["preliminary_thinking"],
+            do_sample=True,
+            temperature=TEMPERATURE["preliminary_thinking"],
+            messages=history,
+            filter_thinking=False,
+        ),
+        stream_callback,
+    )
 
     logger.info(
-        f"[PRELIMINARY_THINKING] Generated {len(response)} chars of reasoning"
+        "[PRELIMINARY_THINKING] Generated %d chars of reasoning", len(response)
     )
 
     return {"preliminary_thinking_text": response}
 
 
 def route_after_input_assembly(state: dict) -> str:
-    """Route after input assembly: thinking node if enabled, else intent classify."""
+    """Route after input assembly: thinking node if enabled, else intent classify.
+
+    With tools disabled (and no thinking step) the intent is already fixed
+    to DIRECT by input_assembly, so the graph goes straight to synthesize.
+    """
     if state.get("thinking_enabled"):
         logger.info("[ROUTE] input_assembly → preliminary_thinking (thinking enabled)")
         return "preliminary_thinking"
+    if not state.get("tool_calling_enabled", True):
+        logger.info("[ROUTE] input_assembly → synthesize (tools disabled)")
+        return "synthesize"
     logger.info("[ROUTE] input_assembly → intent_classify")
     return "intent_classify"
 
@@ -402,7 +864,8 @@ async def input_assembly(state: AgentState) -> dict:
     """
     query = state.get("user_query", "")
 
-    patient_ids = _extract_patient_ids(query)
+    ids, drugs, verbs = _extract_entities(query)
+    patient_ids, drug_mentions, action_verbs = list(ids), list(drugs), list(verbs)
 
     # Inject session patient ID from frontend selector
     session_pid = state.get("session_patient_id")
@@ -411,101 +874,169 @@ async def input_assembly(state: AgentState) -> dict:
 
     entities: ExtractedEntities = {
         "patient_ids": patient_ids,
-        "drug_mentions": _extract_drug_mentions(query),
-        "action_verbs": _extract_action_verbs(query),
+        "drug_mentions": drug_mentions,
+        "action_verbs": action_verbs,
         "has_image": state.get("image_data") is not None,
     }
 
     logger.info(
-        f"[INPUT_ASSEMBLY] entities: "
-        f"patient_ids={entities['patient_ids']}, "
-        f"drugs={entities['drug_mentions']}, "
-        f"verbs={entities['action_verbs']}, "
-        f"image={entities['has_image']}"
+        "[INPUT_ASSEMBLY] entities: patient_ids=%s, drugs=%s, verbs=%s, image=%s",
+        entities["patient_ids"],
+        entities["drug_mentions"],
+        entities["action_verbs"],
+        entities["has_image"],
     )
 
-    result: dict[str, Any] = {"extracted_entities": entities}
+    # Bound the history once per turn; every later node reads it as-is
+    result: dict[str, Any] = {
+        "extracted_entities": entities,
+        "conversation_history": _bounded_history(
+            state.get("conversation_history", [])
+        ),
+    }
+
+    # Pre-fetch patient chart when a session patient is selected. Started
+    # first so the FHIR round-trip overlaps with image analysis below.
+    chart_task = (
+        asyncio.create_task(_prefetch_patient_chart(session_pid))
+        if session_pid
+        else None
+    )
 
     # Pre-process image: run analysis before routing so findings are
     # available to all downstream nodes (including DIRECT route).
     if entities["has_image"]:
-        try:
-            from ..tools.image_analysis import analyze_medical_image
-            from ..tools.schemas import ImageAnalysisInput
+        findings = await _prefetch_image_findings(state["image_data"], query)
+        if findings:
+            result["image_findings"] = findings
 
-            img_result = await analyze_medical_image(
-                ImageAnalysisInput(image_data=state["image_data"], query=query)
-            )
-            if img_result.findings and not img_result.error:
-                result["image_findings"] = img_result.findings
-                logger.info("[INPUT_ASSEMBLY] Image analysis completed")
-            else:
-                logger.warning(f"[INPUT_ASSEMBLY] Image analysis failed: {img_result.error}")
-        except Exception as e:
-            logger.warning(f"[INPUT_ASSEMBLY] Image analysis error: {e}")
-
-    # Pre-fetch patient chart when a session patient is selected
-    if session_pid:
-        try:
-            from ..tools.fhir_store import get_patient_chart
-            from ..tools.fhir_store.schemas import GetPatientChartInput
-
-            chart = await get_patient_chart(GetPatientChartInput(patient_id=session_pid))
-            if chart.result and not chart.error:
-                result["patient_context"] = chart.result
-                logger.info(f"[INPUT_ASSEMBLY] Pre-fetched chart for patient {session_pid}")
-            else:
-                logger.warning(f"[INPUT_ASSEMBLY] Chart fetch failed for {session_pid}: {chart.error}")
-        except Exception as e:
-            logger.warning(f"[INPUT_ASSEMBLY] Chart fetch error for {session_pid}: {e}")
+    if chart_task is not None:
+        chart = await chart_task
+        if chart:
+            result["patient_context"] = chart
+
+    # Tools disabled from frontend → the intent is already decided
+    if not state.get("tool_calling_enabled", True):
+        result.update(_TOOLS_DISABLED_INTENT)
 
     return result
 
 
+async def _prefetch_image_findings(image_data: bytes, query: str) -> str | None:
+    """Run image analysis for input_assembly; None on failure."""
+    try:
+        from ..tools.image_analysis import analyze_medical_image
+        from ..tools.schemas import ImageAnalysisInput
+
+        img_result = await analyze_medical_image(
+            ImageAnalysisInput(image_data=image_data, query=query)
+        )
+        if img_result.findings and not img_result.error:
+            logger.info("[INPUT_ASSEMBLY] Image analysis completed")
+            return img_result.findings
+        logger.warning("[INPUT_ASSEMBLY] Image analysis failed: %s", img_result.error)
+    except Exception as e:
+        logger.warning("[INPUT_ASSEMBLY] Image analysis error: %s", e)
+    return None
+
+
+def invalidate_chart_cache(patient_id: str) -> None:
+    """Drop cached chart data for a patient after its record changes.
+
+    Clears both the input_assembly pre-fetch and any cached
+    get_patient_chart tool result for that patient.
+    """
+    _CHART_CACHE.pop(patient_id)
+    _TOOL_CACHE.pop(_tool_call_key("get_patient_chart", {"patient_id": patient_id}))
+
+
+on_patient_write(invalidate_chart_cache)
+
+
+async def _prefetch_patient_chart(patient_id: str) -> str | None:
+    """Fetch (or reuse a fresh cached) patient chart; None on failure."""
+    cached_chart = _CHART_CACHE.get(patient_id)
+    if cached_chart:
+        logger.info("[INPUT_ASSEMBLY] Reused cached chart for patient %s", patient_id)
+        return cached_chart
+    try:
+        from ..tools.fhir_store import get_patient_chart
+        from ..tools.fhir_store.schemas import GetPatientChartInput
+
+        chart = await get_patient_chart(GetPatientChartInput(patient_id=patient_id))
+        if chart.result and not chart.error:
+            _CHART_CACHE.set(patient_id, chart.result)
+            logger.info("[INPUT_ASSEMBLY] Pre-fetched chart for patient %s", patient_id)
+            return chart.result
+        logger.warning(
+            "[INPUT_ASSEMBLY] Chart fetch failed for %s: %s", patient_id, chart.error
+        )
+    except Exception as e:
+        logger.warning("[INPUT_ASSEMBLY] Chart fetch error for %s: %s", patient_id, e)
+    return None
+
+
 # =============================================================================
 # Node 2: INTENT_CLASSIFY (LLM + Outlines, T=0.0)
 # =============================================================================
 
 
-def intent_classify(state: AgentState, model: DocGemma) -> dict:
+async def intent_classify(state: AgentState, model: DocGemma) -> dict:
     """Classify query as DIRECT or TOOL_NEEDED.
 
     Single constrained generation call at T=0.0 (deterministic).
     Image findings (if any) are injected into the context so the model
     routes based on the actual query, not the presence of an image.
     """
-    # Tools disabled from frontend → force DIRECT route
+    # Tools disabled from frontend → force DIRECT route (reached only via
+    # preliminary_thinking; otherwise input_assembly routes past this node)
     if not state.get("tool_calling_enabled", True):
         logger.info("[INTENT_CLASSIFY] Tools disabled by user, forcing DIRECT")
+        return dict(_TOOLS_DISABLED_INTENT)
+
+    query = state.get("user_query", "")
+    history = state.get("conversation_history", _NO_ITEMS)
+
+    # Fast-path: unambiguous tool requests need no LLM call
+    tool = _fastpath_tool(query)
+    if tool is not None:
+        logger.info(
+            "[INTENT_CLASSIFY:FASTPATH] intent=TOOL_NEEDED, suggested_tool=%s", tool
+        )
         return {
-            "intent": "DIRECT",
-            "task_summary": "Direct response (tools disabled)",
-            "suggested_tool": None,
+            "intent": "TOOL_NEEDED",
+            "task_summary": query,
+            "suggested_tool": tool,
         }
 
-    context = _patient_context_section(state)
-    context += _image_findings_section(state)
+    context = _patient_context_section(state) + _image_findings_section(state)
 
-    prompt = INTENT_CLASSIFY_PROMPT.format(
-        user_query=state.get("user_query", ""),
+    prompt = _render_intent_classify(
+        user_query=query,
         thinking_section=_thinking_context_section(state),
         patient_context_section=context,
     )
-    history = state.get("conversation_history", [])
 
-    result = model.generate_outlines(
-        prompt,
-        IntentClassification,
-        temperature=TEMPERATURE["intent_classify"],
-        max_new_tokens=MAX_TOKENS["intent_classify"],
-        messages=history,
-    )
+    cache_key = _CLASSIFY_CACHE.make_key("intent", prompt, _dumps(history))
+    result = _CLASSIFY_CACHE.get(cache_key)
+    if result is None:
+        result = await model.agenerate_outlines(
+            prompt,
+            IntentClassification,
+            temperature=TEMPERATURE["intent_classify"],
+            max_new_tokens=MAX_TOKENS["intent_classify"],
+            messages=history,
+            routing=True,
+        )
+        _CLASSIFY_CACHE.set(cache_key, result)
 
-    logger.info(
-        f"[INTENT_CLASSIFY] intent={result.intent}, "
-        f"suggested_tool={result.suggested_tool}, "
-        f"summary={_truncate(result.task_summary)}"
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "[INTENT_CLASSIFY] intent=%s, suggested_tool=%s, summary=%s",
+            result.intent,
+            result.suggested_tool,
+            _truncate(result.task_summary),
+        )
 
     return {
         "intent": result.intent,
@@ -519,63 +1050,25 @@ def intent_classify(state: AgentState, model: DocGemma) -> dict:
 # =============================================================================
 
 
-def tool_select(state: AgentState, model: DocGemma) -> dict:
+async def tool_select(state: AgentState, model: DocGemma) -> dict:
     """Select tool and extract arguments in two stages.
 
     Stage 1: Select tool name (single field, no nullable distractors).
+    Stage 1.5: Free-form arg reasoning (thinking mode, multi-field tools only).
     Stage 2: Extract per-tool arguments with entity hints.
     1-shot matched example for Stage 1 (91% arg accuracy, Part II Section 19).
+
+    When intent_classify suggested a tool that needs no arg thinking, its
+    Stage 2 runs speculatively alongside Stage 1 and is kept if Stage 1
+    agrees (one round-trip instead of two).
     """
     query = state.get("user_query", "")
     task_summary = state.get("task_summary", "")
     suggested = state.get("suggested_tool")
-    entities = state.get("extracted_entities", {})
-    history = state.get("conversation_history", [])
-
-    # ── Stage 1: Tool Selection ──
-    example = TOOL_EXAMPLES.get(suggested, TOOL_EXAMPLES["check_drug_safety"])
-
-    stage1_prompt = TOOL_SELECT_STAGE1_PROMPT.format(
-        tool_descriptions=TOOL_DESCRIPTIONS,
-        example_query=example[0],
-        example_tool=example[1],
-        task_summary=task_summary,
-        user_query=query,
-        thinking_section=_thinking_context_section(state),
-    )
-
-    tool_result = model.generate_outlines(
-        stage1_prompt,
-        ToolSelection,
-        temperature=TEMPERATURE["tool_select_stage1"],
-        max_new_tokens=MAX_TOKENS["tool_select_stage1"],
-        messages=history,
-    )
-    tool_name = tool_result.tool_name
-    logger.info(f"[TOOL_SELECT] Stage 1: selected {tool_name}")
-
-    # ── "none" escape hatch: no applicable tool ──
-    if tool_name == "none":
-        logger.info("[TOOL_SELECT] No applicable tool — routing to synthesize")
-        return {
-            "current_tool": "none",
-            "current_args": {},
-            "_planned_tool": None,
-            "_planned_args": None,
-        }
-
-    # ── Stage 2: Per-tool Arguments ──
-    tool_desc = _TOOL_STAGE2_DESC.get(tool_name, "")
-    arg_schema = TOOL_ARG_SCHEMAS.get(tool_name)
-
-    if not arg_schema:
-        logger.warning(f"[TOOL_SELECT] No arg schema for {tool_name}")
-        return {
-            "current_tool": tool_name,
-            "current_args": {},
-            "_planned_tool": tool_name,
-            "_planned_args": {},
-        }
+    entities = state.get("extracted_entities", _NO_ENTITIES)
+    history = state.get("conversation_history", _NO_ITEMS)
+    thinking_enabled = state.get("thinking_enabled", False)
+    thinking_section = _thinking_context_section(state)
 
     # Build entity hints from extracted_entities
     hints = []
@@ -585,51 +1078,118 @@ def tool_select(state: AgentState, model: DocGemma) -> dict:
         hints.append(f"Detected drugs: {', '.join(entities['drug_mentions'])}")
     entity_hints = "\n".join(hints) if hints else ""
 
-    # ── Stage 1.5: Arg Thinking (always runs before argument extraction) ──
-    arg_thinking_section = ""
-    arg_thinking_prompt = TOOL_ARG_THINKING_PROMPT.format(
-        tool_name=tool_name,
-        tool_description=tool_desc,
-        user_query=query,
-        task_summary=task_summary,
-        thinking_section=_thinking_context_section(state),
-        patient_context_section=_patient_context_section(state),
-        entity_hints=f"\nExtracted entities:\n{entity_hints}\n" if entity_hints else "",
-    )
-    arg_thinking_text = model.generate(
-        arg_thinking_prompt,
-        max_new_tokens=MAX_TOKENS["tool_arg_thinking"],
-        do_sample=True,
-        temperature=TEMPERATURE["tool_arg_thinking"],
-        messages=history,
-    )
-    if arg_thinking_text:
-        logger.info(
-            f"[TOOL_SELECT] Arg thinking: {_truncate(arg_thinking_text)}"
+    def _stage2_call(tool_name: str, arg_thinking_section: str) -> Awaitable:
+        stage2_prompt = _render_tool_select_stage2(
+            tool_name=tool_name,
+            tool_description=_TOOL_STAGE2_DESC.get(tool_name, ""),
+            user_query=query,
+            thinking_section=thinking_section,
+            arg_thinking_section=arg_thinking_section,
+            entity_hints=entity_hints,
+        )
+        return model.agenerate_outlines(
+            stage2_prompt,
+            TOOL_ARG_SCHEMAS[tool_name],
+            temperature=TEMPERATURE["tool_select_stage2"],
+            max_new_tokens=MAX_TOKENS["tool_select_stage2"],
+            messages=history,
         )
-        arg_thinking_section = f"\nArgument reasoning:\n{arg_thinking_text}\n"
 
-    stage2_prompt = TOOL_SELECT_STAGE2_PROMPT.format(
-        tool_name=tool_name,
-        tool_description=tool_desc,
-        user_query=query,
-        thinking_section=_thinking_context_section(state),
-        arg_thinking_section=arg_thinking_section,
-        entity_hints=entity_hints,
-    )
+    # ── Speculative Stage 2 for the suggested tool ──
+    speculative: asyncio.Task | None = None
+    if suggested in TOOL_ARG_SCHEMAS and not _wants_arg_thinking(
+        suggested, thinking_enabled
+    ):
+        speculative = asyncio.create_task(_stage2_call(suggested, ""))
 
-    arg_result = model.generate_outlines(
-        stage2_prompt,
-        arg_schema,
-        temperature=TEMPERATURE["tool_select_stage2"],
-        max_new_tokens=MAX_TOKENS["tool_select_stage2"],
-        messages=history,
-    )
+    try:
+        # ── Stage 1: Tool Selection ──
+        # Early exit: on the first step, an intent suggestion confirmed by
+        # the query's sole keyword pattern needs no Stage 1 round-trip
+        if _stage1_agreed(query, suggested, state.get("completed_tools")):
+            tool_name = suggested
+            logger.info("[TOOL_SELECT] Stage 1: skipped, %s agreed by intent and task pattern", tool_name)
+        else:
+            example = TOOL_EXAMPLES.get(suggested, DEFAULT_TOOL_EXAMPLE)
+
+            stage1_prompt = _render_tool_select_stage1(
+                tool_descriptions=TOOL_DESCRIPTIONS,
+                example_query=example[0],
+                example_tool=example[1],
+                task_summary=task_summary,
+                user_query=query,
+                thinking_section=thinking_section,
+            )
+
+            # Cache on the full rendered prompt + history (skipped when
+            # sampled thinking text is part of the prompt)
+            stage1_key = (
+                None
+                if thinking_section
+                else _CLASSIFY_CACHE.make_key("tool_select", stage1_prompt, _dumps(history))
+            )
+            tool_result = _CLASSIFY_CACHE.get(stage1_key) if stage1_key else None
+            if tool_result is None:
+                tool_result = await model.agenerate_outlines(
+                    stage1_prompt,
+                    ToolSelection,
+                    temperature=TEMPERATURE["tool_select_stage1"],
+                    max_new_tokens=MAX_TOKENS["tool_select_stage1"],
+                    messages=history,
+                    routing=True,
+                )
+                if stage1_key:
+                    _CLASSIFY_CACHE.set(stage1_key, tool_result)
+            tool_name = tool_result.tool_name
+            logger.info("[TOOL_SELECT] Stage 1: selected %s", tool_name)
+
+        # Stage 1 disagreed: drop the speculative call now so it stops
+        # holding a server slot while the real Stage 2 runs
+        if speculative is not None and tool_name != suggested:
+            speculative.cancel()
+
+        # ── "none" escape hatch: no applicable tool ──
+        if tool_name == "none":
+            logger.info("[TOOL_SELECT] No applicable tool — routing to synthesize")
+            return {
+                "current_tool": "none",
+                "current_args": {},
+                "_planned_tool": None,
+                "_planned_args": None,
+            }
+
+        # ── Stage 2: Per-tool Arguments ──
+        arg_schema = TOOL_ARG_SCHEMAS.get(tool_name)
+
+        if not arg_schema:
+            logger.warning("[TOOL_SELECT] No arg schema for %s", tool_name)
+            return {
+                "current_tool": tool_name,
+                "current_args": {},
+                "_planned_tool": tool_name,
+                "_planned_args": {},
+            }
+
+        if speculative is not None and tool_name == suggested:
+            logger.info("[TOOL_SELECT] Stage 2: using speculative args")
+            arg_result = await speculative
+        else:
+            arg_result = await _stage2_call(
+                tool_name,
+                await _arg_thinking_section(
+                    model, state, tool_name, entity_hints, thinking_section, history
+                ),
+            )
+    finally:
+        if speculative is not None:
+            if not speculative.done():
+                speculative.cancel()
+            elif not speculative.cancelled():
+                speculative.exception()  # Discarded failures are not errors
 
     args = arg_result.model_dump()
-    logger.info(
-        f"[TOOL_SELECT] Stage 2: args={_truncate(json.dumps(args, default=str))}"
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("[TOOL_SELECT] Stage 2: args=%s", _truncate(_dumps(args)))
 
     return {
         "current_tool": tool_name,
@@ -639,6 +1199,54 @@ def tool_select(state: AgentState, model: DocGemma) -> dict:
     }
 
 
+def _wants_arg_thinking(tool_name: str, thinking_enabled: bool) -> bool:
+    """Stage 1.5 runs only in thinking mode and for multi-field schemas."""
+    return thinking_enabled and len(TOOL_ARG_SCHEMAS[tool_name].model_fields) > 1
+
+
+async def _arg_thinking_section(
+    model: DocGemma,
+    state: AgentState,
+    tool_name: str,
+    entity_hints: str,
+    thinking_section: str,
+    history: list[dict],
+) -> str:
+    """Stage 1.5: free-form arg reasoning, only when it can add information.
+
+    Gated by _wants_arg_thinking: skipped unless the user enabled thinking,
+    and for single-field schemas where the argument is read straight off
+    the query.
+    """
+    if not _wants_arg_thinking(tool_name, state.get("thinking_enabled", False)):
+        logger.info("[TOOL_SELECT] Arg thinking skipped for %s", tool_name)
+        return ""
+    field_count = len(TOOL_ARG_SCHEMAS[tool_name].model_fields)
+
+    arg_thinking_prompt = _render_tool_arg_thinking(
+        tool_name=tool_name,
+        tool_description=_TOOL_STAGE2_DESC.get(tool_name, ""),
+        user_query=state.get("user_query", ""),
+        task_summary=state.get("task_summary", ""),
+        thinking_section=thinking_section,
+        patient_context_section=_patient_context_section(state),
+        entity_hints=f"\nExtracted entities:\n{entity_hints}\n" if entity_hints else "",
+    )
+    arg_thinking_text = await asyncio.to_thread(
+        model.generate,
+        arg_thinking_prompt,
+        max_new_tokens=min(MAX_TOKENS["tool_arg_thinking"], 64 * field_count),
+        do_sample=True,
+        temperature=TEMPERATURE["tool_arg_thinking"],
+        messages=history,
+    )
+    if not arg_thinking_text:
+        return ""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("[TOOL_SELECT] Arg thinking: %s", _truncate(arg_thinking_text))
+    return f"\nArgument reasoning:\n{arg_thinking_text}\n"
+
+
 # =============================================================================
 # Node 4: TOOL_EXECUTE (deterministic, no LLM — async)
 # =============================================================================
@@ -666,11 +1274,34 @@ async def tool_execute(state: AgentState, tool_executor: Callable) -> dict:
     registry_args = _collect_args_for_registry(tool_name, tool_args, state)
     tool_label = TOOL_CLINICAL_LABELS.get(tool_name, tool_name)
 
-    logger.info(
-        f"[TOOL_EXECUTE] {tool_name} with args: "
-        f"{_truncate(json.dumps(registry_args, default=str))}"
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "[TOOL_EXECUTE] %s with args: %s",
+            tool_name,
+            _truncate(_dumps(registry_args)),
+        )
+
+    call_key = _tool_call_key(tool_name, registry_args)
+    duplicate = _is_duplicate_tool_call(
+        call_key, state.get("tool_call_keys") or frozenset()
     )
 
+    # Read-only tools: reuse an identical recent call instead of re-running it
+    cache_key = None
+    if tool_name not in WRITE_TOOLS:
+        cache_key = call_key
+        cached = _TOOL_CACHE.get(cache_key)
+        if cached is not None:
+            logger.info("[TOOL_EXECUTE] %s CACHE HIT", tool_name)
+            return {
+                "tool_results": [{**cached, "args": tool_args, "duplicate": duplicate}],
+                "completed_tools": frozenset({tool_name}),
+                "tool_call_keys": frozenset({call_key}),
+                "step_count": step_count + 1,
+                "_planned_tool": None,
+                "_planned_args": None,
+            }
+
     start = time.perf_counter()
     try:
         result = await tool_executor(tool_name, registry_args)
@@ -684,10 +1315,9 @@ async def tool_execute(state: AgentState, tool_executor: Callable) -> dict:
         if not success:
             raw_error = str(result.get("error", ""))
             error_type = _classify_error(raw_error)
-            error_str = ERROR_TEMPLATES.get(
-                error_type, ERROR_TEMPLATES["generic"]
-            ).format(
-                tool_label=tool_label,
+            error_str = _error_message(
+                error_type,
+                tool_label,
                 entity=(
                     tool_args.get("drug_name")
                     or tool_args.get("name")
@@ -696,16 +1326,11 @@ async def tool_execute(state: AgentState, tool_executor: Callable) -> dict:
                 ),
             )
 
-        # Format result for synthesis — truncate string *values* inside
-        # the dict so the JSON structure stays valid.
+        # Format result for synthesis — bound strings and lists anywhere
+        # in the tree so the JSON structure stays valid.
         formatted = ""
         if success:
-            truncated = {
-                k: (v[:800] + "..." if isinstance(v, str) and len(v) > 800 else v)
-                for k, v in result.items()
-                if v is not None
-            }
-            formatted = json.dumps(truncated, default=str)
+            formatted = _dumps(_truncate_tree(result))
 
         tool_result: ToolResult = {
             "tool_name": tool_name,
@@ -716,13 +1341,23 @@ async def tool_execute(state: AgentState, tool_executor: Callable) -> dict:
             "error": error_str,
             "error_type": error_type,
             "success": success,
+            "duplicate": duplicate,
         }
 
-        status = "SUCCESS" if success else "ERROR"
-        logger.info(f"[TOOL_EXECUTE] {tool_name} {status} in {elapsed_ms:.1f}ms")
+        logger.info(
+            "[TOOL_EXECUTE] %s %s in %.1fms",
+            tool_name,
+            "SUCCESS" if success else "ERROR",
+            elapsed_ms,
+        )
+
+        if success and cache_key is not None:
+            _TOOL_CACHE.set(cache_key, tool_result)
 
         return {
             "tool_results": [tool_result],
+            "completed_tools": frozenset({tool_name}) if success else frozenset(),
+            "tool_call_keys": frozenset({call_key}),
             "step_count": step_count + 1,
             "_planned_tool": None,
             "_planned_args": None,
@@ -731,13 +1366,11 @@ async def tool_execute(state: AgentState, tool_executor: Callable) -> dict:
     except Exception as e:
         elapsed_ms = (time.perf_counter() - start) * 1000
         logger.error(
-            f"[TOOL_EXECUTE] {tool_name} EXCEPTION in {elapsed_ms:.1f}ms: {e}"
+            "[TOOL_EXECUTE] %s EXCEPTION in %.1fms: %s", tool_name, elapsed_ms, e
         )
 
         error_type = _classify_error(str(e))
-        error_str = ERROR_TEMPLATES.get(
-            error_type, ERROR_TEMPLATES["generic"]
-        ).format(tool_label=tool_label, entity="")
+        error_str = _error_message(error_type, tool_label)
 
         tool_result: ToolResult = {
             "tool_name": tool_name,
@@ -748,10 +1381,12 @@ async def tool_execute(state: AgentState, tool_executor: Callable) -> dict:
             "error": error_str,
             "error_type": error_type,
             "success": False,
+            "duplicate": duplicate,
         }
 
         return {
             "tool_results": [tool_result],
+            "tool_call_keys": frozenset({call_key}),
             "step_count": step_count + 1,
             "_planned_tool": None,
             "_planned_args": None,
@@ -763,13 +1398,18 @@ async def tool_execute(state: AgentState, tool_executor: Callable) -> dict:
 # =============================================================================
 
 
-def result_classify(state: AgentState, model: DocGemma) -> dict:
+async def result_classify(state: AgentState, model: DocGemma) -> dict:
     """Classify tool result quality for routing decisions.
 
-    Errors are classified deterministically (fast-path).
-    Successful results use LLM + Outlines (94% accuracy, Part III Section 29).
+    Errors are classified deterministically (fast-path), as are successes
+    that need user clarification or that complete the matched task pattern
+    (the router would synthesize next regardless of the LLM label).
+    Other successful results use LLM + Outlines (94% accuracy, Part III Section 29).
     """
-    tool_results = state.get("tool_results", [])
+    query = state.get("user_query", "")
+    task_summary = state.get("task_summary", "")
+    tool_results = state.get("tool_results", _NO_ITEMS)
+    completed_tools = state.get("completed_tools") or frozenset()
     if not tool_results:
         return {
             "last_result_classification": "no_results",
@@ -781,55 +1421,96 @@ def result_classify(state: AgentState, model: DocGemma) -> dict:
     # Fast-path: errors classified deterministically
     if not last.get("success"):
         error_type = last.get("error_type", "generic")
+        error = last.get("error")
+        # Pre-formatted error for synthesis; returned as a delta because
+        # routers cannot write state
+        error_messages = [
+            *state.get("error_messages", _NO_ITEMS),
+            error or _error_message("generic", last.get("tool_label", "Unknown")),
+        ]
         if error_type in ("timeout", "rate_limit", "server_error"):
             return {
                 "last_result_classification": "error_retryable",
-                "last_result_summary": last.get("error", "Retryable error"),
+                "last_result_summary": error or "Retryable error",
+                "error_messages": error_messages,
             }
         return {
             "last_result_classification": "error_fatal",
-            "last_result_summary": last.get("error", "Fatal error"),
+            "last_result_summary": error or "Fatal error",
+            "error_messages": error_messages,
+        }
+
+    # Fast-path: ambiguous result → ask the user instead of classifying
+    clarification = (
+        _needs_user_clarification(tool_results)
+        if last.get("tool_name") in _CLARIFYING_TOOLS
+        else None
+    )
+    if clarification:
+        logger.info("[RESULT_CLASSIFY] clarification needed (deterministic)")
+        return {
+            "last_result_classification": "success_partial",
+            "last_result_summary": clarification,
+            "clarification_request": clarification,
+        }
+
+    # Fast-path: every tool the task pattern needs has succeeded
+    if _task_pattern_satisfied(_matching_task_patterns(query), completed_tools):
+        logger.info("[RESULT_CLASSIFY] task pattern satisfied (deterministic)")
+        return {
+            "last_result_classification": "success_rich",
+            "last_result_summary": "Task pattern satisfied",
+        }
+
+    # Fast-path: canonical payloads whose quality follows from their shape
+    raw_result = last.get("result")
+    check = _DETERMINISTIC_QUALITY.get(last.get("tool_name", ""))
+    verdict = check(raw_result) if check and isinstance(raw_result, dict) else None
+    if verdict is not None:
+        logger.info("[RESULT_CLASSIFY] quality=%s (deterministic)", verdict[0])
+        return {
+            "last_result_classification": verdict[0],
+            "last_result_summary": verdict[1],
         }
 
     # LLM classification for successful results
     tool_label = last.get("tool_label", last.get("tool_name", "Unknown"))
-    formatted = last.get("formatted_result", str(last.get("result", {})))
 
-    # Truncate the formatted result for the LLM prompt, but keep JSON valid.
-    # If it's valid JSON, re-serialize with truncated string values;
-    # otherwise fall back to plain text truncation.
-    classify_result_text = formatted
-    try:
-        parsed = json.loads(formatted)
-        if isinstance(parsed, dict):
-            parsed = {
-                k: (v[:400] + "..." if isinstance(v, str) and len(v) > 400 else v)
-                for k, v in parsed.items()
-                if v is not None
-            }
-            classify_result_text = json.dumps(parsed, default=str)
-    except (json.JSONDecodeError, TypeError):
-        classify_result_text = _truncate(formatted, 500)
+    # Bound the raw result for the LLM prompt while keeping JSON valid;
+    # fall back to plain text truncation for non-dict results.
+    if isinstance(raw_result, dict):
+        classify_result_text = _dumps(_truncate_tree(raw_result, max_str=400))
+    else:
+        classify_result_text = _truncate(
+            last.get("formatted_result") or _dumps(raw_result or {}), 500
+        )
 
-    prompt = RESULT_CLASSIFY_PROMPT.format(
-        user_query=state.get("user_query", ""),
-        task_summary=state.get("task_summary", ""),
+    prompt = _render_result_classify(
+        user_query=query,
+        task_summary=task_summary,
         thinking_section=_thinking_context_section(state),
         tool_label=tool_label,
         formatted_tool_result=classify_result_text,
     )
 
-    result = model.generate_outlines(
-        prompt,
-        ResultAssessment,
-        temperature=TEMPERATURE["result_classify"],
-        max_new_tokens=MAX_TOKENS["result_classify"],
-    )
+    cache_key = _CLASSIFY_CACHE.make_key("result", prompt)
+    result = _CLASSIFY_CACHE.get(cache_key)
+    if result is None:
+        result = await model.agenerate_outlines(
+            prompt,
+            ResultAssessment,
+            temperature=TEMPERATURE["result_classify"],
+            max_new_tokens=MAX_TOKENS["result_classify"],
+            routing=True,
+        )
+        _CLASSIFY_CACHE.set(cache_key, result)
 
-    logger.info(
-        f"[RESULT_CLASSIFY] quality={result.quality}, "
-        f"summary={_truncate(result.brief_summary)}"
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "[RESULT_CLASSIFY] quality=%s, summary=%s",
+            result.quality,
+            _truncate(result.brief_summary),
+        )
 
     return {
         "last_result_classification": result.quality,
@@ -842,6 +1523,82 @@ def result_classify(state: AgentState, model: DocGemma) -> dict:
 # =============================================================================
 
 
+def _build_synthesis_prompt(state: dict) -> str:
+    """Assemble the tool-route synthesis prompt (pure CPU, no I/O)."""
+    query = state.get("user_query", "")
+    history = state.get("conversation_history", _NO_ITEMS)
+    tool_results = state.get("tool_results", _NO_ITEMS)
+    tools_enabled = state.get("tool_calling_enabled", True)
+
+    # Build error section
+    error_section = ""
+    error_messages = state.get("error_messages", _NO_ITEMS)
+    if error_messages:
+        error_section = (
+            "\n\nUnavailable information:\n"
+            + _format_error_for_synthesis(error_messages)
+        )
+
+    # Build image section (current turn or carried from previous turn)
+    image_section = _image_findings_section(state)
+
+    # Build clarification section
+    clarification_section = ""
+    clarification = state.get("clarification_request")
+    if clarification:
+        clarification_section = f"\n\nClarification needed:\n{clarification}"
+
+    # Build tool-calling status note
+    tools_note = ""
+    if not tools_enabled:
+        tools_note = "\n\nNote: Tool calling is disabled. Answer using only the information above."
+
+    thinking_section = _thinking_context_section(state)
+    patient_context_section = _patient_context_section(state)
+
+    # Build tool results section from what the fixed sections leave over
+    successful = [r for r in tool_results if r.get("success")]
+    tool_results_section = ""
+    if successful:
+        used = len(_SYNTH_SYS_PREFIX) + sum(
+            map(
+                len,
+                (
+                    query,
+                    thinking_section,
+                    patient_context_section,
+                    image_section,
+                    error_section,
+                    clarification_section,
+                ),
+            )
+        )
+        used += sum(
+            len(m["content"]) for m in history if isinstance(m.get("content"), str)
+        )
+        budget = min(
+            _SYNTH_RESULTS_TOTAL_CHARS,
+            max(_SYNTH_RESULT_CHARS, _SYNTH_PROMPT_CHARS - used),
+        )
+        tool_results_section = "\n\nTool findings:\n" + _format_tool_results(
+            successful, budget
+        )
+
+    user_prompt = _render_synthesize_user(
+        user_query=query,
+        task_summary=state.get("task_summary", ""),
+        thinking_section=thinking_section,
+        patient_context_section=patient_context_section,
+        image_section=image_section,
+        tool_results_section=tool_results_section,
+        error_section=error_section,
+        clarification_section=clarification_section,
+    ) + tools_note + f"\n\n{get_time_context()}"
+
+    # Prepend synthesis guidelines to user prompt
+    return _SYNTH_SYS_PREFIX + user_prompt
+
+
 async def synthesize(
     state: AgentState,
     model: DocGemma,
@@ -856,44 +1613,46 @@ async def synthesize(
     No thinking prefix (13% empty output risk, Part IV Section 42).
     """
     query = state.get("user_query", "")
-    history = state.get("conversation_history", [])
+    history = state.get("conversation_history", _NO_ITEMS)
     intent = state.get("intent", "DIRECT")
-    tool_results = state.get("tool_results", [])
+    tool_results = state.get("tool_results", _NO_ITEMS)
 
     tools_enabled = state.get("tool_calling_enabled", True)
 
     # ── Direct route: lightweight conversational prompt ──
     if intent == "DIRECT" and not tool_results:
-        context = _patient_context_section(state)
-        context += _image_findings_section(state)
+        context_parts = [_patient_context_section(state), _image_findings_section(state)]
         if not tools_enabled:
-            context += "\nNote: Tool calling is disabled. Answer using only the information above.\n"
+            context_parts.append(_TOOLS_DISABLED_NOTE)
+        context = "".join(context_parts)
 
-        prompt = DIRECT_CHAT_PROMPT.format(
+        prompt = _render_direct_chat(
             user_query=query,
             thinking_section=_thinking_context_section(state),
             patient_context_section=context,
-        )
+        ) + f"\n\n{get_time_context()}"
 
         if stream_callback:
-            chunks: list[str] = []
-            async for chunk in model.generate_stream(
-                prompt,
-                max_new_tokens=MAX_TOKENS["synthesize"],
-                do_sample=True,
-                temperature=TEMPERATURE["synthesize"],
-                messages=history,
-            ):
-                await stream_callback(chunk)
-                chunks.append(chunk)
-            response = "".join(chunks)
+            response = await _stream_batched(
+                model.generate_stream(
+                    prompt,
+                    max_new_tokens=MAX_TOKENS["synthesize"],
+                    do_sample=True,
+                    temperature=TEMPERATURE["synthesize"],
+                    messages=history,
+                    fast=True,
+                ),
+                stream_callback,
+            )
         else:
-            response = model.generate(
+            response = await asyncio.to_thread(
+                model.generate,
                 prompt,
                 max_new_tokens=MAX_TOKENS["synthesize"],
                 do_sample=True,
                 temperature=TEMPERATURE["synthesize"],
                 messages=history,
+                fast=True,
             )
 
         return {
@@ -903,69 +1662,28 @@ async def synthesize(
 
     # ── Tool/complex route: full synthesis ──
 
-    # Build tool results section
-    tool_results_section = ""
-    if tool_results:
-        sections = []
-        for r in tool_results:
-            if r.get("success"):
-                sections.append(_format_tool_result(r))
-        if sections:
-            tool_results_section = (
-                "\n\nTool findings:\n" + "\n\n".join(sections)
-            )
-
-    # Build error section
-    error_section = ""
-    error_messages = state.get("error_messages", [])
-    if error_messages:
-        error_section = (
-            "\n\nUnavailable information:\n"
-            + _format_error_for_synthesis(error_messages)
-        )
-
-    # Build image section (current turn or carried from previous turn)
-    image_section = _image_findings_section(state)
-
-    # Build clarification section
-    clarification_section = ""
-    clarification = state.get("clarification_request")
-    if clarification:
-        clarification_section = f"\n\nClarification needed:\n{clarification}"
-
-    # Build tool-calling status note
-    tools_note = ""
-    if not tools_enabled:
-        tools_note = "\n\nNote: Tool calling is disabled. Answer using only the information above."
-
-    user_prompt = SYNTHESIZE_USER_TEMPLATE.format(
-        user_query=query,
-        task_summary=state.get("task_summary", ""),
-        thinking_section=_thinking_context_section(state),
-        patient_context_section=_patient_context_section(state),
-        image_section=image_section,
-        tool_results_section=tool_results_section,
-        error_section=error_section,
-        clarification_section=clarification_section,
-    ) + tools_note
-
-    # Prepend synthesis guidelines to user prompt
-    full_prompt = SYNTHESIZE_SYSTEM_PROMPT + "\n\n" + user_prompt
+    # Assembly walks every tool payload; only large ones go to a worker
+    # thread so the event loop keeps serving other sessions
+    payload_chars = sum(len(r.get("formatted_result") or "") for r in tool_results)
+    if payload_chars > _SYNTH_OFFLOAD_CHARS:
+        full_prompt = await asyncio.to_thread(_build_synthesis_prompt, state)
+    else:
+        full_prompt = _build_synthesis_prompt(state)
 
     if stream_callback:
-        chunks = []
-        async for chunk in model.generate_stream(
-            full_prompt,
-            max_new_tokens=MAX_TOKENS["synthesize"],
-            do_sample=True,
-            temperature=TEMPERATURE["synthesize"],
-            messages=history,
-        ):
-            await stream_callback(chunk)
-            chunks.append(chunk)
-        response = "".join(chunks)
+        response = await _stream_batched(
+            model.generate_stream(
+                full_prompt,
+                max_new_tokens=MAX_TOKENS["synthesize"],
+                do_sample=True,
+                temperature=TEMPERATURE["synthesize"],
+                messages=history,
+            ),
+            stream_callback,
+        )
     else:
-        response = model.generate(
+        response = await asyncio.to_thread(
+            model.generate,
             full_prompt,
             max_new_tokens=MAX_TOKENS["synthesize"],
             do_sample=True,
@@ -1019,63 +1737,44 @@ def route_after_result_classify(state: dict) -> str:
     Safety valves: MAX_STEPS, duplicate detection, single-tool default.
     """
     classification = state.get("last_result_classification", "")
+    query = state.get("user_query", "")
+    tool_results = state.get("tool_results", _NO_ITEMS)
+    step_count = state.get("step_count", 0)
 
     # Error → synthesize directly (no retry loop)
     if classification.startswith("error"):
-        # Append pre-formatted error from the last tool result so synthesis has context
-        tool_results = state.get("tool_results", [])
-        if tool_results:
-            last = tool_results[-1]
-            error_msg = last.get("error") or ERROR_TEMPLATES["generic"].format(
-                tool_label=last.get("tool_label", "Unknown"), entity=""
-            )
-            error_messages = list(state.get("error_messages", []))
-            error_messages.append(error_msg)
-            state["error_messages"] = error_messages
-        logger.info(
-            f"[ROUTE] result_classify → synthesize ({classification})"
-        )
+        logger.info("[ROUTE] result_classify → synthesize (%s)", classification)
         return "synthesize"
 
-    query = state.get("user_query", "")
-    tool_results = state.get("tool_results", [])
-    step_count = state.get("step_count", 0)
-
-    # User clarification needed → synthesize
-    if _needs_user_clarification(tool_results):
+    # User clarification needed → synthesize (decided by result_classify)
+    if state.get("clarification_request"):
         logger.info("[ROUTE] result_classify → synthesize (clarification needed)")
         return "synthesize"
 
     # Safety valve: max steps
     if step_count >= MAX_STEPS:
-        logger.info(f"[ROUTE] result_classify → synthesize (max steps {MAX_STEPS})")
+        logger.info("[ROUTE] result_classify → synthesize (max steps %d)", MAX_STEPS)
         return "synthesize"
 
-    # Duplicate tool call detection
-    current_tool = state.get("current_tool")
-    current_args = state.get("current_args", {})
-    if current_tool and _is_duplicate_tool_call(
-        current_tool, current_args, tool_results[:-1] if tool_results else []
-    ):
+    # Duplicate tool call detection (flagged by tool_execute)
+    if tool_results and tool_results[-1].get("duplicate"):
         logger.info("[ROUTE] result_classify → synthesize (duplicate tool call)")
         return "synthesize"
 
     # Task pattern fully satisfied → synthesize
-    if _task_pattern_satisfied(query, tool_results):
+    completed_tools = state.get("completed_tools") or frozenset()
+    patterns = _matching_task_patterns(query)
+    if _task_pattern_satisfied(patterns, completed_tools):
         logger.info("[ROUTE] result_classify → synthesize (task pattern satisfied)")
         return "synthesize"
 
-    # Check if a pattern was matched but NOT yet satisfied → need more tools
-    completed_tools = {r["tool_name"] for r in tool_results if r.get("success")}
-    for pattern in TASK_PATTERNS.values():
-        if _match_task_pattern(query, pattern):
-            required = pattern["requires"]
-            if not required.issubset(completed_tools):
-                logger.info(
-                    f"[ROUTE] result_classify → tool_select "
-                    f"(pattern needs: {required - completed_tools})"
-                )
-                return "tool_select"
+    # A pattern was matched but NOT yet satisfied → need more tools
+    if patterns:
+        missing = patterns[0]["requires"] - completed_tools
+        logger.info(
+            "[ROUTE] result_classify → tool_select (pattern needs: %s)", missing
+        )
+        return "tool_select"
 
     # No pattern matched — single-tool default: synthesize after first good result
     logger.info("[ROUTE] result_classify → synthesize (single-tool default)")
@@ -14,20 +14,18 @@ Key principles (from the Prompting Guide):
 - Error pre-formatting (4.8→10/10 quality, Part IV §48)
 """
 
+from datetime import date, datetime, timezone
+from functools import lru_cache
+
 
 # =============================================================================
 # SYSTEM PROMPT (prepended to every API call via model.py)
 # =============================================================================
 
 
-def build_system_prompt() -> str:
-    """Build system prompt with current date and time."""
-    from datetime import datetime, timezone
-
-    now = datetime.now(timezone.utc)
-    date_str = now.strftime("%A, %B %d, %Y")
-    time_str = now.strftime("%H:%M UTC")
-
+@lru_cache(maxsize=1)
+def _system_prompt_for(day: date) -> str:
+    date_str = day.strftime("%A, %B %d, %Y")
     return (
         "You are DocGemma, a clinical decision-support assistant. "
         "You are accessed through a web chat interface by clinicians. "
@@ -36,10 +34,27 @@ def build_system_prompt() -> str:
         "chat page to provide you with that patient's context. "
         "To analyze medical images, clinicians must upload or select 'Attach to chat' "
         "on an image — you cannot access images unless they are attached. "
-        f"Current date: {date_str}. Current time: {time_str}."
+        f"Current date: {date_str}."
     )
 
 
+def build_system_prompt() -> str:
+    """Build system prompt with the current date.
+
+    The system prompt is the first message of every API call, so it is
+    the head of the endpoint's prefix cache. Stamping it only with the
+    date keeps it byte-identical (one shared string) for the whole day;
+    the time of day goes at the tail of the user message instead via
+    :func:`get_time_context`.
+    """
+    return _system_prompt_for(datetime.now(timezone.utc).date())
+
+
+def get_time_context() -> str:
+    """Current UTC time line for the tail of clinician-facing prompts."""
+    return f"Current time: {datetime.now(timezone.utc).strftime('%H:%M UTC')}."
+
+
 # =============================================================================
 # TEMPERATURE & MAX TOKEN SETTINGS
 # =============================================================================
@@ -56,11 +71,11 @@ TEMPERATURE: dict[str, float] = {
 
 MAX_TOKENS: dict[str, int] = {
     "preliminary_thinking": 512,
-    "intent_classify": 256,
-    "tool_select_stage1": 64,
+    "intent_classify": 160,       # ~30 JSON/enum tokens + ~50-word task_summary
+    "tool_select_stage1": 32,     # {"tool_name": <enum>} — ~15 tokens
     "tool_arg_thinking": 256,     # Reasoning about how to fill tool arguments
-    "tool_select_stage2": 128,
-    "result_classify": 128,
+    "tool_select_stage2": 128,    # Bounded by note_text for save_clinical_note
+    "result_classify": 128,       # ~20 JSON/enum tokens + 1-2 sentence summary
     "synthesize": 256,            # Validated optimum (Part IV §46)
 }
 
@@ -145,6 +160,22 @@ TOOL_DESCRIPTIONS = """Available tools:
 """
 
 
+def _summarize_tools(descriptions: str) -> str:
+    """Reduce TOOL_DESCRIPTIONS to one line per tool: signature + first sentence."""
+    lines = ["Available tools:"]
+    for entry in descriptions.split("\n\n- ")[1:]:
+        signature, _, description = " ".join(entry.split()).partition(" — ")
+        if signature == "none":
+            continue
+        lines.append(f"- {signature} — {description.split('. ')[0].rstrip('.')}")
+    return "\n".join(lines) + "\n"
+
+
+# Compact list for steps that reason about tools but do not pick one
+# (preliminary thinking); Stage 1 keeps the full descriptions.
+TOOL_SUMMARY = _summarize_tools(TOOL_DESCRIPTIONS)
+
+
 # =============================================================================
 # 1-SHOT EXAMPLES PER TOOL (for TOOL_SELECT Stage 1 — Part II §19)
 #   1-shot matched to suggested_tool is the sweet spot at 91% arg accuracy.
@@ -186,11 +217,15 @@ TOOL_EXAMPLES: dict[str, tuple[str, str]] = {
 }
 
 # Fallback example when suggested_tool is None or unrecognised
-_DEFAULT_EXAMPLE = TOOL_EXAMPLES["check_drug_safety"]
+DEFAULT_TOOL_EXAMPLE = TOOL_EXAMPLES["check_drug_safety"]
 
 
 # =============================================================================
 # NODE PROMPTS
+#   Static instructions come first and per-request fields last, so the
+#   endpoint's prefix cache can reuse the instruction block across calls.
+#   Among the fields, session-stable ones (patient record) precede
+#   per-turn ones (thinking, query) for the same reason.
 # =============================================================================
 
 # ── Preliminary Thinking (optional pre-reasoning step) ────────────────────────
@@ -199,7 +234,7 @@ PRELIMINARY_THINKING_PROMPT = """\
 You are a clinical decision-support assistant. Think through the following query
 step by step. Consider: what clinical information is needed, what tools might help,
 and what the key medical considerations are.
-{patient_context_section}{image_section}
+{tools_section}{patient_context_section}{image_section}
 Query: {user_query}
 
 Think step by step:"""
@@ -221,7 +256,7 @@ Classification rules:
 
 Provide a task_summary that captures the clinical context in ~50 words or fewer.
 If TOOL_NEEDED, suggest the most relevant tool name.
-{thinking_section}{patient_context_section}
+{patient_context_section}{thinking_section}
 Query: {user_query}"""
 
 
@@ -245,28 +280,28 @@ User query: {user_query}"""
 # ── Node 3 Stage 1.5: TOOL_ARG_THINKING (free-form reasoning for args) ──────
 
 TOOL_ARG_THINKING_PROMPT = """\
-You are constructing a call to the {tool_name} tool. Think step by step about
-how to fill in the arguments correctly.
-
-Tool: {tool_name}
-Description: {tool_description}
+You are constructing a tool call. Think step by step about how to fill in the
+arguments correctly.
 
-User query: {user_query}
-Clinical context: {task_summary}
-{thinking_section}{patient_context_section}{entity_hints}
 Consider:
 - What specific values should each argument have?
 - Are there patient IDs, drug names, or other entities already identified?
 - Does the patient context provide relevant information?
 - Are there any implicit details in the query that should be extracted?
 
+Tool: {tool_name}
+Description: {tool_description}
+{patient_context_section}
+User query: {user_query}
+Clinical context: {task_summary}
+{thinking_section}{entity_hints}
 Think step by step about the correct arguments:"""
 
 
 # ── Node 3 Stage 2: TOOL_SELECT (per-tool args) ─────────────────────────────
 
 TOOL_SELECT_STAGE2_PROMPT = """\
-Extract the arguments for the {tool_name} tool from the user's request.
+Extract the arguments for the tool below from the user's request.
 
 Tool: {tool_name}
 Description: {tool_description}
@@ -279,16 +314,15 @@ Fill in the required arguments."""
 # ── Node 5: RESULT_CLASSIFY ──────────────────────────────────────────────────
 
 RESULT_CLASSIFY_PROMPT = """\
-You are evaluating a tool result. Classify the quality of the data returned.
+You are evaluating a tool result. Classify the quality of the data returned
+and provide a brief summary.
 
 User's original question: {user_query}
 Clinical context: {task_summary}
 {thinking_section}
 Tool used: {tool_label}
 Result:
-{formatted_tool_result}
-
-Classify the result quality and provide a brief summary."""
+{formatted_tool_result}"""
 
 
 # ── Node 7: SYNTHESIZE (system prompt) ───────────────────────────────────────
@@ -305,13 +339,14 @@ Guidelines:
 
 
 # ── Node 7: SYNTHESIZE (user message assembly template) ──────────────────────
+#   Ordered from most to least stable: the session's patient record and image
+#   findings lead, then this turn's framing, then the question and results.
 
 SYNTHESIZE_USER_TEMPLATE = """\
-Clinician's question: {user_query}
-
+{patient_context_section}{image_section}
 Clinical context: {task_summary}
-{thinking_section}{patient_context_section}\
-{image_section}\
+{thinking_section}
+Clinician's question: {user_query}\
 {tool_results_section}\
 {error_section}\
 {clarification_section}"""
@@ -321,7 +356,7 @@ Clinical context: {task_summary}
 
 DIRECT_CHAT_PROMPT = """\
 You are responding to a clinician (not the patient). Be concise.
-{thinking_section}{patient_context_section}
+{patient_context_section}{thinking_section}
 Query: {user_query}"""
 
 
@@ -12,6 +12,19 @@ from typing import Literal, Optional
 from pydantic import BaseModel, Field
 
 
+# Executable tools, shared by the intent suggestion and Stage 1 selection so
+# both decode against the same enum
+ToolName = Literal[
+    "check_drug_safety",
+    "check_drug_interactions",
+    "search_medical_literature",
+    "find_clinical_trials",
+    "prescribe_medication",
+    "add_allergy",
+    "save_clinical_note",
+]
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Node 2 — Intent Classification
 # ─────────────────────────────────────────────────────────────────────────────
@@ -23,7 +36,7 @@ class IntentClassification(BaseModel):
     task_summary: str = Field(
         description="Brief clinical summary of the user's request (~50 words max)",
     )
-    suggested_tool: Optional[str] = Field(
+    suggested_tool: Optional[ToolName] = Field(
         default=None,
         description="If TOOL_NEEDED, which tool is most likely relevant",
     )
@@ -36,16 +49,7 @@ class IntentClassification(BaseModel):
 class ToolSelection(BaseModel):
     """Select the appropriate tool.  Single field — no null cascade risk."""
 
-    tool_name: Literal[
-        "none",
-        "check_drug_safety",
-        "check_drug_interactions",
-        "search_medical_literature",
-        "find_clinical_trials",
-        "prescribe_medication",
-        "add_allergy",
-        "save_clinical_note",
-    ]
+    tool_name: Literal["none", ToolName]
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -130,3 +134,10 @@ class ResultAssessment(BaseModel):
     )
 
 
+# Every schema passed to agenerate_outlines — warmed once at graph build
+OUTLINES_SCHEMAS: tuple[type[BaseModel], ...] = (
+    IntentClassification,
+    ToolSelection,
+    *TOOL_ARG_SCHEMAS.values(),
+    ResultAssessment,
+)
@@ -6,10 +6,28 @@ Empirically grounded in 856 experiments on MedGemma 27B.
 
 from __future__ import annotations
 
-import operator
 from typing import Annotated, Any, Optional, TypedDict
 
 
+# Reducers for the per-turn accumulating channels. LangGraph applies the
+# reducer to the initial input as well, so plain list/set addition would
+# carry the previous turn's results forward on the session thread; passing
+# None (see graph._make_initial_state) resets them.
+
+def _extend_or_reset(current: list, update: list | None) -> list:
+    """Append update to current; None starts a new turn with an empty list."""
+    if update is None:
+        return []
+    return current + update
+
+
+def _union_or_reset(current: frozenset, update: frozenset | None) -> frozenset:
+    """Union update into current; None starts a new turn with an empty set."""
+    if update is None:
+        return frozenset()
+    return current | update
+
+
 class ExtractedEntities(TypedDict):
     """Pre-extracted entities from deterministic input assembly."""
 
@@ -30,6 +48,7 @@ class ToolResult(TypedDict, total=False):
     error: Optional[str]
     error_type: Optional[str]  # Category for routing (timeout, not_found, etc.)
     success: bool  # Required by agent_runner.py
+    duplicate: bool  # Same tool + args already ran earlier in the turn
 
 
 class AgentState(TypedDict, total=False):
@@ -56,7 +75,9 @@ class AgentState(TypedDict, total=False):
     # ── Tool Loop (Nodes 3-6) ──
     current_tool: Optional[str]
     current_args: Optional[dict[str, Any]]
-    tool_results: Annotated[list[ToolResult], operator.add]  # Accumulates
+    tool_results: Annotated[list[ToolResult], _extend_or_reset]  # Accumulates per turn
+    completed_tools: Annotated[frozenset[str], _union_or_reset]  # Names of successful tools
+    tool_call_keys: Annotated[frozenset[str], _union_or_reset]  # Canonical tool+args keys run so far
     step_count: int  # Number of tool loop iterations completed
 
     # ── Result Classification (Node 5) ──
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import json as _json
+import logging
 import os
-from collections.abc import AsyncGenerator, Callable
-from typing import TYPE_CHECKING
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable
+from typing import TYPE_CHECKING, TypeVar
 
 import re
 
@@ -14,6 +17,10 @@ import httpx
 if TYPE_CHECKING:
     from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
 # MedGemma wraps internal thinking in <unused94>...<unused95> tokens.
 # Strip these from all free-form output so they never reach the user.
 _THINKING_RE = re.compile(r"<unused94>.*?<unused95>", re.DOTALL)
@@ -26,6 +33,23 @@ _THINKING_PREFIX_RE = re.compile(r"^thought\s*", re.IGNORECASE)
 _THINKING_MAX_WORDS = 256
 
 
+@functools.lru_cache(maxsize=32)
+def _response_format(out_type: type[BaseModel]) -> dict:
+    """Build the guided-decoding ``response_format`` for a schema (memoized).
+
+    ``model_json_schema()`` walks the whole Pydantic model; the result is
+    identical for every call with the same class, so it is built once.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": out_type.__name__,
+            "schema": out_type.model_json_schema(),
+            "strict": True,
+        },
+    }
+
+
 class DocGemma:
     """DocGemma client for OpenAI-compatible vLLM endpoint.
 
@@ -48,6 +72,9 @@ class DocGemma:
         model: str | None = None,
         timeout: float = 120.0,
         system_prompt: str | Callable[[], str] | None = None,
+        guided_backend: str | None = None,
+        router_model: str | None = None,
+        fast_model: str | None = None,
     ) -> None:
         """Initialize remote client.
 
@@ -61,6 +88,15 @@ class DocGemma:
             system_prompt: Optional system prompt prepended to every API call.
                            Can be a string or a callable that returns a string
                            (called per request for dynamic content like timestamps).
+            guided_backend: vLLM guided-decoding backend for structured calls
+                            (e.g. "xgrammar"). If None, uses
+                            DOCGEMMA_GUIDED_BACKEND env var, else the server default.
+            router_model: Model ID for short routing classifications (e.g. a
+                          quantized variant on the same endpoint). If None,
+                          uses DOCGEMMA_ROUTER_MODEL env var, else ``model``.
+            fast_model: Model ID for conversational (no-tool) answers, where
+                        a smaller model suffices. If None, uses
+                        DOCGEMMA_FAST_MODEL env var, else ``model``.
         """
         self._endpoint = endpoint or os.environ.get("DOCGEMMA_ENDPOINT")
         if not self._endpoint:
@@ -74,6 +110,13 @@ class DocGemma:
         self._model = model or os.environ.get("DOCGEMMA_MODEL", "google/medgemma-27b-it")
         self._timeout = timeout
         self._system_prompt = system_prompt
+        self._guided_backend = guided_backend or os.environ.get("DOCGEMMA_GUIDED_BACKEND")
+        self._router_model = (
+            router_model or os.environ.get("DOCGEMMA_ROUTER_MODEL") or self._model
+        )
+        self._fast_model = (
+            fast_model or os.environ.get("DOCGEMMA_FAST_MODEL") or self._model
+        )
 
         headers = {"Content-Type": "application/json"}
         if self._api_key:
@@ -81,6 +124,8 @@ class DocGemma:
 
         self._client = httpx.Client(timeout=timeout, headers=headers)
         self._async_client = httpx.AsyncClient(timeout=timeout, headers=headers)
+        # In-flight agenerate_outlines calls: key -> [task, waiter count]
+        self._inflight: dict[tuple, list] = {}
 
         # Captured thinking text from the most recent generate/generate_stream call.
         # Read by the synthesize node to include in the clinical trace.
@@ -153,14 +198,13 @@ class DocGemma:
         all_messages: list[dict],
         max_new_tokens: int,
         temperature: float,
+        model_id: str,
     ) -> str:
         """Make a continuation call after a runaway thinking block (sync).
 
         Truncates the thinking, closes it with <unused95>, then uses vLLM's
         ``continue_final_message`` to let the model produce the real answer.
         """
-        import json
-
         prefix = self._truncate_thinking(raw_response)
         if not prefix:
             return raw_response
@@ -170,7 +214,7 @@ class DocGemma:
         ]
 
         payload = {
-            "model": self._model,
+            "model": model_id,
             "messages": continuation_messages,
             "max_tokens": max_new_tokens,
             "temperature": temperature,
@@ -178,7 +222,7 @@ class DocGemma:
             "add_generation_prompt": False,
         }
 
-        print("[*] Continuation: thinking ran away, retrying with assistant prefill")
+        logger.info("[*] Continuation: thinking ran away, retrying with assistant prefill")
         resp = self._client.post(
             f"{self._endpoint}/v1/chat/completions",
             json=payload,
@@ -186,8 +230,8 @@ class DocGemma:
         resp.raise_for_status()
 
         response = resp.json()["choices"][0]["message"]["content"]
-        print("[*] Continuation result:", json.dumps({"response": response}, indent=2))
-        print("*********************")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[*] Continuation result: %s", _json.dumps({"response": response}, indent=2))
         return response
 
     async def _continue_after_thinking_stream(
@@ -196,6 +240,7 @@ class DocGemma:
         all_messages: list[dict],
         max_new_tokens: int,
         temperature: float,
+        model_id: str,
     ) -> AsyncGenerator[str, None]:
         """Make a streaming continuation call after a runaway thinking block.
 
@@ -213,7 +258,7 @@ class DocGemma:
         ]
 
         payload = {
-            "model": self._model,
+            "model": model_id,
             "messages": continuation_messages,
             "max_tokens": max_new_tokens,
             "stream": True,
@@ -222,7 +267,7 @@ class DocGemma:
             "add_generation_prompt": False,
         }
 
-        print("[*] Continuation (stream): thinking ran away, retrying with assistant prefill")
+        logger.info("[*] Continuation (stream): thinking ran away, retrying with assistant prefill")
 
         in_thinking = False
         async with self._async_client.stream(
@@ -281,6 +326,7 @@ class DocGemma:
         temperature: float = 0.6,
         image_base64: str | None = None,
         messages: list[dict] | None = None,
+        fast: bool = False,
         **kwargs,
     ) -> str:
         """Generate free-form response via OpenAI-compatible API.
@@ -292,13 +338,12 @@ class DocGemma:
             temperature: Sampling temperature (used if do_sample=True).
             image_base64: Optional base64-encoded image for vision queries.
             messages: Optional prior conversation turns to prepend.
+            fast: Serve with the fast model (conversational answers).
             **kwargs: Additional arguments (ignored for compatibility).
 
         Returns:
             Generated text response.
         """
-        import json
-
         if image_base64:
             current_msg = {"role": "user", "content": [
                 {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}},
@@ -310,7 +355,7 @@ class DocGemma:
         all_messages = self._build_messages(list(messages or []) + [current_msg])
 
         payload = {
-            "model": self._model,
+            "model": self._fast_model if fast else self._model,
             "messages": all_messages,
             "max_tokens": max_new_tokens,
         }
@@ -327,8 +372,8 @@ class DocGemma:
         resp.raise_for_status()
 
         response = resp.json()["choices"][0]["message"]["content"]
-        print("[*] Raw:", json.dumps({"input": all_messages, "response": response}, indent=2))
-        print("*********************")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[*] Raw: %s", _json.dumps({"input": all_messages, "response": response}, indent=2))
 
         # Capture thinking text for clinical trace before stripping
         self.last_thinking_text = self._extract_thinking(response)
@@ -344,6 +389,7 @@ class DocGemma:
         if needs_continuation:
             response = self._continue_after_thinking(
                 response, all_messages, max_new_tokens, payload["temperature"],
+                payload["model"],
             )
 
         return _THINKING_RE.sub("", response).strip()
@@ -357,6 +403,7 @@ class DocGemma:
         image_base64: str | None = None,
         messages: list[dict] | None = None,
         filter_thinking: bool = True,
+        fast: bool = False,
     ) -> AsyncGenerator[str, None]:
         """Stream free-form response token-by-token via SSE.
 
@@ -370,6 +417,7 @@ class DocGemma:
             filter_thinking: If True (default), strip <unused94>...<unused95>
                 thinking blocks. If False, yield all content as-is (used by
                 preliminary_thinking node to expose reasoning).
+            fast: Serve with the fast model (conversational answers).
 
         Yields:
             Text chunks as they arrive.
@@ -385,7 +433,7 @@ class DocGemma:
         all_messages = self._build_messages(list(messages or []) + [current_msg])
 
         payload = {
-            "model": self._model,
+            "model": self._fast_model if fast else self._model,
             "messages": all_messages,
             "max_tokens": max_new_tokens,
             "stream": True,
@@ -435,8 +483,8 @@ class DocGemma:
 
             self.last_thinking_text = None
             full_response = "".join(full_response_parts)
-            print("[*] Stream (raw):", _json.dumps({"input": all_messages, "response": full_response}, indent=2))
-            print("*********************")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[*] Stream (raw): %s", _json.dumps({"input": all_messages, "response": full_response}, indent=2))
             return
 
         # ── Filtered mode (default): strip thinking blocks entirely ──
@@ -507,6 +555,7 @@ class DocGemma:
             temp = payload.get("temperature", 0.0)
             async for chunk in self._continue_after_thinking_stream(
                 thinking_buffer, all_messages, max_new_tokens, temp,
+                payload["model"],
             ):
                 full_response_parts.append(chunk)
                 yield chunk
@@ -518,14 +567,14 @@ class DocGemma:
             self.last_thinking_text = None
 
         full_response = "".join(full_response_parts)
-        print("[*] Stream:", _json.dumps({"input": all_messages, "response": full_response}, indent=2))
-        print("*********************")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[*] Stream: %s", _json.dumps({"input": all_messages, "response": full_response}, indent=2))
 
     async def aclose(self) -> None:
         """Close the async HTTP client."""
         await self._async_client.aclose()
 
-    def generate_outlines(
+    async def agenerate_outlines(
         self,
         prompt: str,
         out_type: type[BaseModel],
@@ -533,11 +582,17 @@ class DocGemma:
         temperature: float = 0.1,
         max_retries: int = 3,
         messages: list[dict] | None = None,
+        routing: bool = False,
     ) -> BaseModel:
         """Generate structured response matching Pydantic schema.
 
         Uses vLLM's guided decoding via response_format parameter.
         Includes retry logic for truncated/malformed JSON responses.
+        Runs on the async HTTP client, so callers can overlap independent
+        structured calls with ``asyncio.gather``/tasks. Identical concurrent
+        requests (same model, messages, schema, temperature and token
+        limit) share one HTTP call; it is cancelled only once every caller
+        waiting on it has been cancelled.
 
         Args:
             prompt: The input prompt.
@@ -547,6 +602,8 @@ class DocGemma:
                          Recommended: 0.0-0.2 for structured output.
             max_retries: Maximum retry attempts for JSON parsing failures.
             messages: Optional prior conversation turns to prepend.
+            routing: Serve from the router model (discrete-label
+                     classifications that tolerate a smaller/quantized model).
 
         Returns:
             Instance of out_type with generated values.
@@ -554,39 +611,82 @@ class DocGemma:
         Raises:
             ValueError: If all retry attempts fail with JSON parsing errors.
         """
-        import json
-        import time
-
         all_messages = self._build_messages(
             list(messages or []) + [{"role": "user", "content": prompt}]
         )
-        schema = out_type.model_json_schema()
+        model_id = self._router_model if routing else self._model
+        key = (model_id, _json.dumps(all_messages), out_type, temperature, max_new_tokens)
+        return await self._coalesced(
+            key,
+            lambda: self._agenerate_outlines(
+                prompt,
+                model_id,
+                all_messages,
+                out_type,
+                max_new_tokens,
+                temperature,
+                max_retries,
+            ),
+        )
+
+    async def _coalesced(self, key: tuple, start: Callable[[], Awaitable[T]]) -> T:
+        """Await the in-flight call for key, starting it via start() if none.
+
+        The shared task is shielded from individual cancellations and is
+        cancelled only once every caller waiting on it has gone away.
+        """
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(start())
+            entry = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda t: self._inflight_done(key, t))
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+
+    def _inflight_done(self, key: tuple, task: asyncio.Future) -> None:
+        """Drop a finished in-flight call and mark its exception retrieved."""
+        if self._inflight.get(key, (None,))[0] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _agenerate_outlines(
+        self,
+        prompt: str,
+        model_id: str,
+        all_messages: list[dict],
+        out_type: type[BaseModel],
+        max_new_tokens: int,
+        temperature: float,
+        max_retries: int,
+    ) -> BaseModel:
+        """Run one structured request with retries (see agenerate_outlines)."""
+        response_format = _response_format(out_type)
 
         last_error = None
         last_response_text = None
 
         for attempt in range(max_retries):
             # Increase max_tokens on retry to handle truncation
-            tokens_for_attempt = max_new_tokens + (attempt * 256)
-
             payload = {
-                "model": self._model,
+                "model": model_id,
                 "messages": all_messages,
-                "max_tokens": tokens_for_attempt,
+                "max_tokens": max_new_tokens + (attempt * 256),
                 "temperature": temperature,
-                # vLLM guided decoding via response_format
-                "response_format": {
-                    "type": "json_schema",
-                    "json_schema": {
-                        "name": out_type.__name__,
-                        "schema": schema,
-                        "strict": True,
-                    },
-                },
+                "response_format": response_format,
             }
+            if self._guided_backend:
+                payload["guided_decoding_backend"] = self._guided_backend
 
             try:
-                resp = self._client.post(
+                resp = await self._async_client.post(
                     f"{self._endpoint}/v1/chat/completions",
                     json=payload,
                 )
@@ -595,46 +695,50 @@ class DocGemma:
                 response_text = resp.json()["choices"][0]["message"]["content"]
                 last_response_text = response_text
 
-                # Parse JSON response into Pydantic model
                 response = out_type.model_validate_json(response_text)
 
-                print("[*] Outlines:", json.dumps({"input": prompt, "response": response.model_dump()}, indent=2))
-                print("*********************")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[*] Outlines: %s", _json.dumps({"input": prompt, "response": response.model_dump()}, indent=2))
                 return response
 
             except Exception as e:
                 last_error = e
-                error_msg = str(e)
-
-                # Check if it's a JSON parsing error (truncation issue)
                 is_json_error = any(
-                    indicator in error_msg.lower()
+                    indicator in str(e).lower()
                     for indicator in ["json", "eof", "parsing", "unterminated", "expecting"]
                 )
 
                 if is_json_error and attempt < max_retries - 1:
-                    # Exponential backoff: 0.5s, 1s, 2s
-                    backoff = 0.5 * (2 ** attempt)
-                    print(f"[*] Outlines: JSON parsing failed (attempt {attempt + 1}/{max_retries}) retrying with more tokens in...")
+                    logger.warning(
+                        "[*] Outlines: JSON parsing failed (attempt %d/%d), retrying with more tokens",
+                        attempt + 1,
+                        max_retries,
+                    )
                     continue
                 elif not is_json_error:
-                    # Non-JSON error, raise immediately
                     raise
 
-        # All retries exhausted
         raise ValueError(
             f"Failed to generate valid JSON after {max_retries} attempts. "
             f"Last error: {last_error}\n"
             f"Last response (truncated): {last_response_text[:200] if last_response_text else 'None'}..."
         )
 
+    def warm_schemas(self, schemas: Iterable[type[BaseModel]]) -> None:
+        """Precompute guided-decoding payloads for the given output schemas.
+
+        Call once at startup so the first request of each node does not pay
+        for JSON-schema generation.
+        """
+        for out_type in schemas:
+            _response_format(out_type)
+
     def close(self) -> None:
         """Close HTTP clients (sync and async)."""
         self._client.close()
         # Async client should be closed via aclose() in async context,
         # but we attempt cleanup here as a fallback
         try:
-            import asyncio
             loop = asyncio.get_running_loop()
             loop.create_task(self._async_client.aclose())
         except RuntimeError:
@@ -7,6 +7,8 @@ this tool extracts interaction information from FDA-approved drug labels.
 
 from __future__ import annotations
 
+import asyncio
+
 import httpx
 
 from .schemas import DrugInteraction, DrugInteractionsInput, DrugInteractionsOutput
@@ -50,10 +52,13 @@ async def check_drug_interactions(
             interactions: list[DrugInteraction] = []
             resolved_rxcuis: dict[str, str | None] = {}
 
-            # For each drug, fetch its label and look for interactions with other drugs
-            for drug in drugs:
-                label_data = await _fetch_drug_label(client, drug)
+            # Fetch every drug's label concurrently (independent requests)
+            labels = await asyncio.gather(
+                *(_fetch_drug_label(client, drug) for drug in drugs)
+            )
 
+            # For each drug, look for interactions with other drugs in its label
+            for drug, label_data in zip(drugs, labels):
                 if label_data is None:
                     resolved_rxcuis[drug] = None
                     continue
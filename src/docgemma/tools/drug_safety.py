@@ -83,6 +83,7 @@ async def check_drug_safety(input_data: DrugSafetyInput) -> DrugSafetyOutput:
 
                 return DrugSafetyOutput(
                     brand_name=brand_name,
+                    label_found=True,
                     has_warning=True,
                     boxed_warning=warning_text,
                     error=None,
@@ -90,6 +91,7 @@ async def check_drug_safety(input_data: DrugSafetyInput) -> DrugSafetyOutput:
 
             return DrugSafetyOutput(
                 brand_name=brand_name,
+                label_found=True,
                 has_warning=False,
                 boxed_warning=None,
                 error=None,
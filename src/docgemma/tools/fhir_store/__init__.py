@@ -30,13 +30,14 @@ from .schemas import (
     SearchPatientOutput,
 )
 from .search import search_patient
-from .store import FhirJsonStore, ResourceNotFoundError, get_client
+from .store import FhirJsonStore, ResourceNotFoundError, get_client, on_patient_write
 
 __all__ = [
     # Client
     "FhirJsonStore",
     "ResourceNotFoundError",
     "get_client",
+    "on_patient_write",
     # Tool functions
     "search_patient",
     "get_patient_chart",
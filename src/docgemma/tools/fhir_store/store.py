@@ -9,6 +9,7 @@ from __future__ import annotations
 import json
 import os
 import uuid
+from collections.abc import Callable
 from pathlib import Path
 
 
@@ -76,7 +77,9 @@ class FhirJsonStore:
         file_path = self._data_dir / resource_type / f"{resource_id}.json"
         if not file_path.exists():
             raise ResourceNotFoundError(f"{resource_type}/{resource_id} not found")
+        resource = json.loads(file_path.read_text(encoding="utf-8"))
         file_path.unlink()
+        _notify_patient_write(resource)
         return True
 
     async def post(self, path: str, data: dict) -> dict:
@@ -95,6 +98,7 @@ class FhirJsonStore:
 
         dest = resource_dir / f"{resource_id}.json"
         dest.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        _notify_patient_write(data)
 
         return data
 
@@ -250,6 +254,34 @@ class FhirJsonStore:
         return current if isinstance(current, str) else None
 
 
+# --------------------------------------------------------------------------
+# Patient write listeners
+# --------------------------------------------------------------------------
+
+_patient_write_listeners: list[Callable[[str], None]] = []
+
+
+def on_patient_write(listener: Callable[[str], None]) -> None:
+    """Register *listener* to be called with a patient ID whenever a
+    resource referencing that patient is written or deleted.
+
+    Used by consumers that cache chart data (e.g. the agent) to drop
+    stale copies. Registering the same listener twice is a no-op.
+    """
+    if listener not in _patient_write_listeners:
+        _patient_write_listeners.append(listener)
+
+
+def _notify_patient_write(resource: dict) -> None:
+    """Call every registered listener for the patient *resource* belongs to."""
+    ref = FhirJsonStore._extract_reference(resource, "subject")
+    patient_id = ref.removeprefix("Patient/")
+    if not patient_id:
+        return
+    for listener in _patient_write_listeners:
+        listener(patient_id)
+
+
 # --------------------------------------------------------------------------
 # Global singleton (mirrors medplum.client.get_client)
 # --------------------------------------------------------------------------
@@ -128,21 +128,21 @@ class ToolRegistry:
         Returns:
             Tool result dict
         """
-        print(f"[TOOL] Executing {tool_name} with args: {args}")
+        logger.info("[TOOL] Executing %s with args: %s", tool_name, args)
         
         if tool_name == "none" or not tool_name:
-            print(f"[TOOL] Skipped: No tool needed")
+            logger.info("[TOOL] Skipped: No tool needed")
             return {"skipped": True, "reason": "No tool needed"}
 
         tool = self._tools.get(tool_name)
         if not tool:
             error_msg = f"Unknown tool: {tool_name}"
-            print(f"[TOOL] ERROR: {error_msg}")
+            logger.error("[TOOL] ERROR: %s", error_msg)
             return {"error": error_msg}
 
         if not tool.executor:
             error_msg = f"Tool {tool_name} has no executor registered"
-            print(f"[TOOL] ERROR: {error_msg}")
+            logger.error("[TOOL] ERROR: %s", error_msg)
             return {"error": error_msg}
 
         # Map schema fields to executor params using arg_mapping
@@ -156,18 +156,20 @@ class ToolRegistry:
 
         try:
             result = await tool.executor(**mapped_args)
-            # Log success with truncated result
-            result_preview = str(result)[:200] + "..." if len(str(result)) > 200 else str(result)
-            print(f"[TOOL] SUCCESS {tool_name}: {result_preview}")
+            # Log success with truncated result (repr only built when logged)
+            if logger.isEnabledFor(logging.DEBUG):
+                result_str = str(result)
+                result_preview = result_str[:200] + "..." if len(result_str) > 200 else result_str
+                logger.debug("[TOOL] SUCCESS %s: %s", tool_name, result_preview)
             return result
         except TypeError as e:
             # Handle missing/extra arguments gracefully
             error_msg = f"Argument error for {tool_name}: {e}"
-            print(f"[TOOL] ERROR: {error_msg}")
+            logger.error("[TOOL] ERROR: %s", error_msg)
             return {"error": error_msg}
         except Exception as e:
             error_msg = f"Tool {tool_name} failed: {e}"
-            print(f"[TOOL] ERROR: {error_msg}")
+            logger.error("[TOOL] ERROR: %s", error_msg)
             return {"error": error_msg}
 
 
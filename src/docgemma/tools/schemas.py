@@ -30,6 +30,9 @@ class DrugSafetyOutput(BaseModel):
     """Output schema for drug safety check results."""
 
     brand_name: str = Field(..., description="The queried drug name")
+    label_found: bool = Field(
+        False, description="Whether an FDA label was found for the drug"
+    )
     has_warning: bool = Field(..., description="Whether a boxed warning exists")
     boxed_warning: str | None = Field(
         None, description="The boxed warning text if present"
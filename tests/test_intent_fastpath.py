@@ -0,0 +1,63 @@
+"""Tests for the intent_classify fast path (explicit imperative tool requests)."""
+
+import pytest
+
+from docgemma.agent.nodes import _fastpath_tool
+
+PATIENT_ID = "abc-123"
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (f"Prescribe lisinopril 10mg daily for patient {PATIENT_ID}", "prescribe_medication"),
+        (f"please prescribe metformin 500mg BID for {PATIENT_ID}", "prescribe_medication"),
+        ("Check interactions between warfarin and aspirin", "check_drug_interactions"),
+        ("check warfarin and aspirin for interactions", "check_drug_interactions"),
+    ],
+)
+def test_imperative_requests_take_fast_path(query, expected):
+    assert _fastpath_tool(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        f"What dose of lisinopril should I prescribe for {PATIENT_ID}?",
+        f"Should I prescribe lisinopril for {PATIENT_ID}",
+        f"Can we prescribe lisinopril to {PATIENT_ID}",
+        f"prescribe lisinopril for {PATIENT_ID}?",
+        "Does warfarin interact with aspirin?",
+        "Should I check interactions between warfarin and aspirin",
+        "How do I check warfarin and aspirin interactions",
+    ],
+)
+def test_questions_fall_through_to_classifier(query):
+    assert _fastpath_tool(query) is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        f"Do not prescribe lisinopril for {PATIENT_ID}",
+        f"Prescribe lisinopril for {PATIENT_ID} instead of enalapril",
+        f"prescribe lisinopril for {PATIENT_ID} without checking labs",
+        "Check interactions between warfarin and aspirin, don't include herbals",
+    ],
+)
+def test_negated_requests_fall_through_to_classifier(query):
+    assert _fastpath_tool(query) is None
+
+
+def test_prescribe_requires_patient_named_in_query():
+    # A selected session patient is not part of the query text and must not
+    # stand in for an explicitly named one.
+    assert _fastpath_tool("Prescribe lisinopril 10mg daily") is None
+
+
+def test_interaction_check_requires_two_drugs():
+    assert _fastpath_tool("Check interactions for warfarin") is None
+
+
+def test_prescribe_must_lead_the_request():
+    assert _fastpath_tool(f"Note that I prescribe lisinopril for {PATIENT_ID}") is None
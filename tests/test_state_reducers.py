@@ -0,0 +1,34 @@
+"""Tests for the per-turn reset semantics of the AgentState reducers."""
+
+from docgemma.agent.state import _extend_or_reset, _union_or_reset
+
+
+def test_extend_appends_within_a_turn():
+    first = [{"tool_name": "check_drug_safety"}]
+    second = [{"tool_name": "search_medical_literature"}]
+    assert _extend_or_reset(first, second) == first + second
+
+
+def test_extend_reset_starts_empty():
+    assert _extend_or_reset([{"tool_name": "check_drug_safety"}], None) == []
+
+
+def test_extend_does_not_mutate_current():
+    current = [{"tool_name": "check_drug_safety"}]
+    _extend_or_reset(current, [{"tool_name": "get_patient_chart"}])
+    assert current == [{"tool_name": "check_drug_safety"}]
+
+
+def test_union_merges_within_a_turn():
+    assert _union_or_reset(frozenset({"a"}), frozenset({"b"})) == frozenset({"a", "b"})
+
+
+def test_union_reset_starts_empty():
+    assert _union_or_reset(frozenset({"a", "b"}), None) == frozenset()
+
+
+def test_reset_then_update_starts_a_fresh_turn():
+    # _make_initial_state sends None, then nodes send their updates
+    completed = _union_or_reset(frozenset({"check_drug_safety"}), None)
+    completed = _union_or_reset(completed, frozenset({"get_patient_chart"}))
+    assert completed == frozenset({"get_patient_chart"})